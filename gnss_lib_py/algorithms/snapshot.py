@@ -294,10 +294,12 @@ def wls(rx_est_m, pos_sv_m, corr_pr_m, weights = None,
             # the signal to reach the Earth and the satellite clock bias.
             delta_t = (corr_pr_m.reshape(-1) - rx_est_m[3,0])/consts.C
             dtheta = consts.OMEGA_E_DOT*delta_t
-            pos_sv_m[:, 0] = np.cos(dtheta)*rx_time_pos_sv_m[:,0] + \
-                             np.sin(dtheta)*rx_time_pos_sv_m[:,1]
-            pos_sv_m[:, 1] = -np.sin(dtheta)*rx_time_pos_sv_m[:,0] + \
-                              np.cos(dtheta)*rx_time_pos_sv_m[:,1]
+            cos_dtheta = np.cos(dtheta)
+            sin_dtheta = np.sin(dtheta)
+            pos_sv_m[:, 0] = cos_dtheta*rx_time_pos_sv_m[:,0] + \
+                             sin_dtheta*rx_time_pos_sv_m[:,1]
+            pos_sv_m[:, 1] = -sin_dtheta*rx_time_pos_sv_m[:,0] + \
+                              cos_dtheta*rx_time_pos_sv_m[:,1]
 
         count += 1
 
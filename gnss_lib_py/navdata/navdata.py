@@ -7,7 +7,6 @@ __date__ = "03 Nov 2021"
 
 import os
 import re
-import copy
 
 import numpy as np
 import pandas as pd
@@ -471,7 +470,7 @@ class NavData():
         rows : None/list/np.ndarray
             Strings or integers indicating rows to keep in copy.
             Defaults to None meaning all rows are copied.
-        cols : None/list/np.ndarray
+        cols : None/list/np.ndarray/slice
             Integers indicating columns to keep in copy. Defaults to
             None meaning all cols are copied.
 
@@ -485,21 +484,80 @@ class NavData():
         inv_map = self.inv_map
         if rows is None:
             rows = self.rows
+        # rows repeated in the input are only copied once
+        keys = list(dict.fromkeys(inv_map[row_idx]
+                                  if isinstance(row_idx, (int, np.integer))
+                                  else row_idx for row_idx in rows))
+        row_idxs = [self.map[key] for key in keys]
         if cols is None:
-            col_indices = slice(None, None).indices(len(self))
-            cols = np.arange(col_indices[0], col_indices[1], col_indices[2])
-        for row_idx in rows:
-            new_row = copy.deepcopy(self[row_idx, cols])
-            if isinstance(row_idx, int):
-                key = inv_map[row_idx]
+            cols = slice(None)
+        if len(row_idxs) > 0:
+            # Copy the kept rows and columns with a single indexing of
+            # the array instead of setting each row again, string rows
+            # keep their existing string maps
+            if isinstance(cols, slice):
+                new_navdata.array = self.array[row_idxs, cols]
             else:
-                key = row_idx
-            new_navdata[key] = new_row
-
+                cols = np.reshape(cols, -1)
+                if cols.size == 0:
+                    cols = cols.astype(int)
+                new_navdata.array = self.array[np.ix_(row_idxs, cols)]
+        new_navdata.map = {key : row_num for row_num, key in enumerate(keys)}
+        new_navdata.str_map = {key : self.str_map[key].copy() for key in keys}
         new_navdata.orig_dtypes = self.orig_dtypes.copy()
 
         return new_navdata
 
+    def add_rows(self, new_rows):
+        """Add multiple new numeric rows at once.
+
+        Adding rows one at a time stacks a new copy of the entire array
+        for every row, while this method stacks all new rows together.
+
+        Parameters
+        ----------
+        new_rows : dict
+            Dictionary of the form {row name : values}. Values are
+            numbers or numeric arrays with one value per column. Row
+            names must not already exist in NavData.
+
+        """
+        if len(new_rows) == 0:
+            return
+        for key in new_rows:
+            if not isinstance(key, str):
+                raise KeyError('Row indices must be strings when assigning new values')
+            if key in self.map:
+                raise KeyError("row '" + key + "' already exists in " \
+                             + "NavData, set it directly instead.")
+        new_values = [np.asarray(new_value) for new_value in new_rows.values()]
+        for new_value in new_values:
+            assert new_value.dtype != object \
+               and not np.issubdtype(new_value.dtype, np.dtype('U')), \
+                "Cannot add string rows together, please set them individually"
+
+        if self.array.shape == (0,0):
+            # if empty array, the first row sets the number of columns
+            num_rows = 0
+            num_cols = new_values[0].size
+        else:
+            num_rows, num_cols = self.shape
+        new_array = np.empty([len(new_values), num_cols], dtype=self.arr_dtype)
+        for row_num, new_value in enumerate(new_values):
+            new_array[row_num, :] = np.reshape(new_value, -1)
+        if num_rows == 0:
+            self.array = new_array
+        else:
+            self.array = np.vstack((self.array, new_array))
+
+        for row_num, (key, new_value) in enumerate(zip(new_rows, new_values)):
+            self.map[key] = num_rows + row_num
+            self.str_map[key] = {}
+            dtype = new_value.dtype
+            if np.issubdtype(dtype, np.integer):
+                dtype = np.int64
+            self.orig_dtypes[key] = dtype
+
     def remove(self, rows=None, cols=None, inplace=False):
         """Reset NavData to remove specified rows and columns
 
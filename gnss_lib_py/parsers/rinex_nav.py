@@ -14,8 +14,11 @@ __authors__ = "Ashwin Kanhere, Shubh Gupta"
 __date__ = "13 July 2021"
 
 import os
+import re
 import warnings
 from datetime import timezone
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pandas as pd
@@ -24,8 +27,21 @@ import georinex as gr
 import gnss_lib_py.utils.constants as consts
 from gnss_lib_py.navdata.navdata import NavData
 from gnss_lib_py.utils.time_conversions import datetime_to_gps_millis, gps_millis_to_tow
+from gnss_lib_py.utils.time_conversions import GPS_EPOCH_0_DATETIME64
+from gnss_lib_py.utils.gnss_sv_ids import split_gnss_sv_ids
 from gnss_lib_py.utils.ephemeris_downloader import load_ephemeris, DEFAULT_EPHEM_PATH
 
+LEAP_SECONDS_PATTERN = re.compile(r'\s*(-?\d+)')
+"""re.Pattern : Current leap seconds at the start of a header line."""
+
+WEEK_NANOS = consts.WEEKSEC * 1000000000
+"""int : Number of nanoseconds in a GPS week."""
+
+CLOCK_EPHEMERIS_ROWS = ('deltaN', 'M_0', 'sqrtA', 'e', 'gps_week', 't_oe',
+                        't_oc', 'SVclockBias', 'SVclockDrift',
+                        'SVclockDriftRate', 'TGD')
+"""tuple : Ephemeris rows needed to estimate satellite clock corrections."""
+
 
 class RinexNav(NavData):
     """Class to parse Rinex navigation files containing SV parameters.
@@ -48,10 +64,23 @@ class RinexNav(NavData):
         parameters in ``iono_array``.
     verbose : bool
         If true, prints debugging statements.
+    use_cache : bool
+        If true, parsed files are kept in and reused from the in-memory
+        cache described in the notes.
+
+    Notes
+    -----
+    Parsing Rinex files with georinex is slow. With ``use_cache=True``
+    the parsed contents of the 16 most recently loaded files (and their
+    headers) are cached in memory for the life of the process and reused
+    while the files are unchanged on disk, which helps when the same
+    files are loaded repeatedly. The cache is not used by default, call
+    ``RinexNav.clear_cache()`` to free the memory held by the cache.
 
     """
 
-    def __init__(self, input_paths, satellites=None, verbose=False):
+    def __init__(self, input_paths, satellites=None, verbose=False,
+                 use_cache=False):
         """Rinex specific loading and preprocessing
 
         Parameters
@@ -62,10 +91,16 @@ class RinexNav(NavData):
             List of satellite IDs as a string, for example ['G01','E11',
             'R06']. Defaults to None which returns get_ephemeris for
             all satellites.
+        verbose : bool
+            If true, prints debugging statements.
+        use_cache : bool
+            If true, reuses and caches parsed Rinex files in memory,
+            see the class notes. Defaults to False.
 
         """
         self.iono_params = None
         self.verbose = verbose
+        self.use_cache = use_cache
         pd_df = self.preprocess(input_paths, satellites)
 
         super().__init__(pandas_df=pd_df)
@@ -104,16 +139,29 @@ class RinexNav(NavData):
         if isinstance(rinex_paths, (str, os.PathLike)):
             rinex_paths = [rinex_paths]
 
-        data = pd.DataFrame()
+        # Files are independent until concatenation so parse them in
+        # parallel threads, georinex mostly waits on I/O and NumPy
+        max_workers = max(1, min(len(rinex_paths), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = list(executor.map(
+                        lambda path: self._get_ephemeris_dataframe(path,
+                                                        constellations,
+                                                        satellites),
+                        rinex_paths))
+
+        frames = []
         self.iono_params = {}
-        for rinex_path in rinex_paths:
-            new_data, rinex_header = self._get_ephemeris_dataframe(rinex_path,
-                                                                   constellations)
-            data = pd.concat((data,new_data), ignore_index=True)
+        for new_data, rinex_header, first_time in loaded:
+            if len(new_data) > 0:
+                # skip files without any of the requested satellites
+                frames.append(new_data)
+            if first_time is None:
+                continue
             # The pandas dataframe is indexed by a (time, sv) tuple and
-            # the following line gets the date of the first entry and
-            # converts it to an equivalent time in gps_millis
-            first_time = new_data['time'][0]
+            # the date of its first entry is converted to an equivalent
+            # time in gps_millis. The ionospheric parameters are kept
+            # for every file, even without any requested satellites.
+            # Times are timezone naive UTC so the timezone is added here.
             day_start_time = first_time.replace(hour=0,
                                                 minute=0,
                                                 second=0,
@@ -132,33 +180,32 @@ class RinexNav(NavData):
                             self.iono_params[start_gps_millis][constellation] \
                             = value
             #TODO: Find a more pythonic way to do this^
-        data.reset_index(inplace=True, drop=True)
-        data.sort_values('time', inplace=True, ignore_index=True)
-
-        if satellites is not None:
-            data = data.loc[data['sv'].isin(satellites)]
-
-        # Move sv to DataFrame columns, reset index
-        data = data.reset_index(drop=True)
-        # Replace datetime with gps_millis
-        # Use the vectorized version of datetime_to_gps_millis
-        gps_millis = datetime_to_gps_millis(data['time'])
-        # gps_millis = [np.float64(datetime_to_gps_millis(df_row['time'])) \
-        #                 for _, df_row in data.iterrows()]
+        if len(frames) == 0:
+            raise RuntimeError("No ephemeris data available for the " \
+                             + "given satellites")
+        # Concatenate once after the loop to avoid quadratic copying
+        data = pd.concat(frames, ignore_index=True, copy=False)
+        data.sort_values('time', inplace=True, ignore_index=True,
+                         kind='stable')
+        # Replace datetime with gps_millis, converting the underlying
+        # datetime64 array in one vectorized operation
+        gps_millis = datetime_to_gps_millis(data['time'].to_numpy())
         data['gps_millis'] = gps_millis
         data = data.drop(columns=['time'])
         data = data.rename(columns={"sv":"sv_id"})
         if "GPSWeek" in data.columns:
             data = data.rename(columns={"GPSWeek":"gps_week"})
             if "GALWeek" in data.columns:
-                data["gps_week"] = np.where(pd.isnull(data["gps_week"]),
-                                                      data["GALWeek"],
-                                                      data["gps_week"])
+                # Galileo weeks are identical to GPS weeks, so fill the
+                # missing GPS weeks from the underlying arrays and drop
+                # the now redundant Galileo column
+                gps_week = data["gps_week"].to_numpy()
+                gal_week = data["GALWeek"].to_numpy()
+                data["gps_week"] = np.where(np.isnan(gps_week),
+                                            gal_week, gps_week)
+                data.drop(columns="GALWeek", inplace=True)
         elif "GALWeek" in data.columns:
             data = data.rename(columns={"GALWeek":"gps_week"})
-        if len(data) == 0:
-            raise RuntimeError("No ephemeris data available for the " \
-                             + "given satellites")
         return data
 
     def postprocess(self):
@@ -171,14 +218,21 @@ class RinexNav(NavData):
 
         """
 
-        self['gnss_sv_id'] = self['sv_id']
-        gnss_chars = [sv_id[0] for sv_id in np.atleast_1d(self['sv_id'])]
-        gnss_nums = [sv_id[1:] for sv_id in np.atleast_1d(self['sv_id'])]
-        gnss_id = [consts.CONSTELLATION_CHARS[gnss_char] for gnss_char in gnss_chars]
-        self['gnss_id'] = np.asarray(gnss_id)
-        self['sv_id'] = np.asarray(gnss_nums, dtype=int)
-
-    def _get_ephemeris_dataframe(self, rinex_path, constellations=None):
+        # NavData stores strings as integer codes, so split each unique
+        # identifier once and index the results with the codes instead
+        # of decoding every string
+        sv_codes = self.array[self.map['sv_id'], :].astype(int)
+        sv_strings = np.empty(max(self.str_map['sv_id'], default=-1) + 1,
+                              dtype=object)
+        for code, sv_string in self.str_map['sv_id'].items():
+            sv_strings[code] = sv_string
+        gnss_id_lut, sv_id_lut = split_gnss_sv_ids(sv_strings)
+        self['gnss_sv_id'] = sv_strings[sv_codes]
+        self['gnss_id'] = gnss_id_lut[sv_codes]
+        self['sv_id'] = sv_id_lut[sv_codes]
+
+    def _get_ephemeris_dataframe(self, rinex_path, constellations=None,
+                                 satellites=None):
         """Load/download ephemeris files and process into DataFrame
 
         Parameters
@@ -187,6 +241,9 @@ class RinexNav(NavData):
             Filepath to rinex file
         constellations : set
             Set of satellites {"ConstIDSVID"}
+        satellites : List
+            List of satellite IDs as a string, for example ['G01','E11',
+            'R06']. Defaults to None which keeps all satellites.
 
         Returns
         -------
@@ -194,32 +251,39 @@ class RinexNav(NavData):
             Parsed ephemeris DataFrame
         data_header : dict
             Header information from Rinex file.
+        first_time : pd.Timestamp or None
+            Time of the first entry in the file before any satellites
+            are dropped, None if the file has no entries.
 
         """
 
-        if constellations is not None:
-            data = gr.load(rinex_path,
-                                 use=constellations,
-                                 verbose=self.verbose).to_dataframe()
-        else:
-            data = gr.load(rinex_path,
-                                 verbose=self.verbose).to_dataframe()
-        data.dropna(how='all', inplace=True)
-        data.reset_index(inplace=True)
-        data_header = gr.rinexheader(rinex_path)
+        data = _load_rinex_dataframe(rinex_path, constellations,
+                                     self.verbose, self.use_cache)
+        first_time = data['time'].iloc[0] if len(data) > 0 else None
+        if satellites is not None:
+            # Drop unrequested satellites before any further processing,
+            # filtering on integer category codes rather than hashing
+            # every object dtype string against the satellite list
+            sv_categories = pd.Categorical(data['sv'])
+            keep_codes = np.flatnonzero(sv_categories.categories.isin(satellites))
+            data = data.loc[np.isin(sv_categories.codes, keep_codes)]
+            data.reset_index(drop=True, inplace=True)
+        data_header = _load_rinex_header(rinex_path, self.use_cache)
         leap_seconds = self.load_leapseconds(data_header)
         data['leap_seconds'] = leap_seconds
         data['source'] = rinex_path
-        data['t_oc'] = pd.to_numeric(data['time'] - consts.GPS_EPOCH_0.replace(tzinfo=None))
-        data['t_oc']  = 1e-9 * data['t_oc'] - consts.WEEKSEC * np.floor(1e-9 * data['t_oc'] / consts.WEEKSEC)
-        data['time'] = data['time'].dt.tz_localize('UTC')
+        # Time of week of the clock in a single pass over integer
+        # nanoseconds since the GPS epoch
+        toc_ns = (data['time'].to_numpy(dtype='datetime64[ns]')
+                  - GPS_EPOCH_0_DATETIME64).astype(np.int64)
+        data['t_oc'] = 1e-9 * np.mod(toc_ns, WEEK_NANOS)
         # Rename Keplerian orbital parameters to match a GLP standard
         data.rename(columns={'M0': 'M_0', 'Eccentricity': 'e', 'Toe': 't_oe', 'DeltaN': 'deltaN', 'Cuc': 'C_uc', 'Cus': 'C_us',
                              'Cic': 'C_ic', 'Crc': 'C_rc', 'Cis': 'C_is', 'Crs': 'C_rs', 'Io': 'i_0', 'Omega0': 'Omega_0'}, inplace=True)
         data.rename(columns={'X': 'sv_x_m', 'dX': 'sv_dx_mps', 'dX2': 'sv_dx2_mps2',
                              'Y': 'sv_y_m', 'dY': 'sv_dy_mps', 'dY2': 'sv_dy2_mps2',
                              'Z': 'sv_z_m', 'dZ': 'sv_dz_mps', 'dZ2': 'sv_dz2_mps2'}, )
-        return data, data_header
+        return data, data_header, first_time
 
     def get_iono_params(self, rinex_header, constellations=None):
         """Gets ionosphere parameters from RINEX file header for calculation of
@@ -248,14 +312,16 @@ class RinexNav(NavData):
         iono_params = {}
         # If path ends in .n, then the file contains only GPS satellites
         if rinex_header['filetype']=='N' and rinex_header['systems']=='G':
-            try:
-                ion_alpha_str = rinex_header['ION ALPHA'].replace('D', 'E')
-                ion_alpha = np.array(list(map(float, ion_alpha_str.split())))
-                ion_beta_str = rinex_header['ION BETA'].replace('D', 'E')
-                ion_beta = np.array(list(map(float, ion_beta_str.split())))
-            except KeyError:
+            ion_alpha_str = rinex_header.get('ION ALPHA')
+            ion_beta_str = rinex_header.get('ION BETA')
+            if ion_alpha_str is None or ion_beta_str is None:
                 ion_alpha = np.array([[np.nan]])
                 ion_beta = np.array([[np.nan]])
+            else:
+                ion_alpha_str = ion_alpha_str.replace('D', 'E')
+                ion_alpha = np.array(list(map(float, ion_alpha_str.split())))
+                ion_beta_str = ion_beta_str.replace('D', 'E')
+                ion_beta = np.array(list(map(float, ion_beta_str.split())))
             gps_iono_params = np.vstack((ion_alpha, ion_beta))
             iono_params['gps'] = gps_iono_params
         # If the path ends in .g, then the file constains GLONASS and no
@@ -329,26 +395,252 @@ class RinexNav(NavData):
             Leap seconds read from file, return ``np.nan``  if not found.
 
         """
-        if rinex_header['systems']=='M':
-            try:
-                leap_seconds_line = rinex_header['LEAP SECONDS']
-                leap_seconds = int(leap_seconds_line[4]+leap_seconds_line[5])
-            except KeyError:
-                leap_seconds = np.nan
-        else:
-            try:
-                leap_seconds = int(rinex_header['LEAP SECONDS'].split()[0])
-            except KeyError:
-                leap_seconds = np.nan
+        # Current leap seconds are the first integer on the line for
+        # both Rinex 2 and Rinex 3 headers
+        leap_seconds_match = None
+        if 'LEAP SECONDS' in rinex_header:
+            leap_seconds_match = LEAP_SECONDS_PATTERN.match(
+                                        rinex_header['LEAP SECONDS'])
+        if leap_seconds_match is None:
+            return np.nan
+        leap_seconds = int(leap_seconds_match.group(1))
         return leap_seconds
 
+    @staticmethod
+    def clear_cache():
+        """Clear the parsed Rinex files and headers cached in memory.
+
+        """
+        _cached_rinex_dataframe.cache_clear()
+        _cached_rinex_header.cache_clear()
 
-def _compute_eccentric_anomaly(gps_week, gps_tow, ephem, tol=1e-5, max_iter=10):
+
+def _load_rinex_header(rinex_path, use_cache=False):
+    """Load the header of a Rinex file, reusing previously parsed headers.
+
+    Parsed headers are cached by absolute path and modification time so
+    that repeatedly loading the same file does not parse the header
+    again, while edited files are still reloaded.
+
+    Parameters
+    ----------
+    rinex_path : string or path-like
+        Filepath to rinex file.
+    use_cache : bool
+        If true, reuses and caches the parsed header in memory.
+        Defaults to False.
+
+    Returns
+    -------
+    rinex_header : dict
+        Header information from Rinex file.
+
+    """
+    if not use_cache:
+        return gr.rinexheader(rinex_path)
+    rinex_path = os.path.abspath(rinex_path)
+    header = _cached_rinex_header(rinex_path, os.path.getmtime(rinex_path))
+    # shallow copy so callers cannot modify the cached header
+    return dict(header)
+
+
+@lru_cache(maxsize=64)
+def _cached_rinex_header(rinex_path, mtime): # pylint: disable=unused-argument
+    """Parse and cache the header of a Rinex file.
+
+    Parameters
+    ----------
+    rinex_path : string
+        Absolute filepath to rinex file.
+    mtime : float
+        Modification time of the file, used only as part of the cache
+        key.
+
+    Returns
+    -------
+    rinex_header : dict
+        Header information from Rinex file.
+
+    """
+    return gr.rinexheader(rinex_path)
+
+
+def _load_rinex_dataframe(rinex_path, constellations=None, verbose=False,
+                          use_cache=False):
+    """Parse a Rinex navigation file, reusing previously parsed files.
+
+    Parsing with georinex is the most expensive step of loading Rinex
+    navigation files, so parsed DataFrames are cached by absolute path,
+    modification time and constellations in the same way as headers.
+
+    Parameters
+    ----------
+    rinex_path : string or path-like
+        Filepath to rinex file.
+    constellations : set
+        Set of constellation characters to load, for example {'G'}.
+        Defaults to None which loads all constellations.
+    verbose : bool
+        If true, prints debugging statements.
+    use_cache : bool
+        If true, reuses and caches the parsed DataFrame in memory.
+        Defaults to False.
+
+    Returns
+    -------
+    data : pd.DataFrame
+        Parsed ephemeris DataFrame with `time` and `sv` columns.
+
+    """
+    if not use_cache:
+        return _parse_rinex_dataframe(rinex_path, constellations, verbose)
+    rinex_path = os.path.abspath(rinex_path)
+    if constellations is not None:
+        constellations = tuple(sorted(constellations))
+    data = _cached_rinex_dataframe(rinex_path, os.path.getmtime(rinex_path),
+                                   constellations, verbose)
+    # copy so callers cannot modify the cached DataFrame
+    return data.copy()
+
+
+@lru_cache(maxsize=16)
+def _cached_rinex_dataframe(rinex_path, mtime, constellations,
+                            verbose): # pylint: disable=unused-argument
+    """Parse and cache a Rinex navigation file.
+
+    Parameters
+    ----------
+    rinex_path : string
+        Absolute filepath to rinex file.
+    mtime : float
+        Modification time of the file, used only as part of the cache
+        key.
+    constellations : tuple
+        Sorted constellation characters to load or None for all.
+    verbose : bool
+        If true, prints debugging statements.
+
+    Returns
+    -------
+    data : pd.DataFrame
+        Parsed ephemeris DataFrame with `time` and `sv` columns.
+
+    """
+    return _parse_rinex_dataframe(rinex_path, constellations, verbose)
+
+
+def _parse_rinex_dataframe(rinex_path, constellations=None, verbose=False):
+    """Parse a Rinex navigation file into a DataFrame.
+
+    Parameters
+    ----------
+    rinex_path : string or path-like
+        Filepath to rinex file.
+    constellations : set or tuple
+        Constellation characters to load or None for all.
+    verbose : bool
+        If true, prints debugging statements.
+
+    Returns
+    -------
+    data : pd.DataFrame
+        Parsed ephemeris DataFrame with `time` and `sv` columns.
+
+    """
+    if constellations is not None:
+        data = gr.load(rinex_path,
+                             use=set(constellations),
+                             verbose=verbose).to_dataframe()
+    else:
+        data = gr.load(rinex_path,
+                             verbose=verbose).to_dataframe()
+    data.dropna(how='all', inplace=True)
+    data.reset_index(inplace=True)
+    return data
+
+
+def _unpack_ephem(ephem, keys):
+    """Extract ephemeris parameters as float64 arrays in one operation.
+
+    Indexing NavData once per parameter copies each row separately, so
+    all required rows are gathered from the underlying array at once.
+    The gathered array is always C-contiguous float64, whatever the
+    layout of the NavData array, so that every parameter is a
+    contiguous row that NumPy can process with vectorized loops.
+
+    Parameters
+    ----------
+    ephem : gnss_lib_py.navdata.navdata.NavData or dict
+        NavData instance containing ephemeris parameters of satellites,
+        or a dictionary already returned by this function, in which
+        case it is returned unchanged.
+    keys : tuple
+        Names of the ephemeris rows to extract.
+
+    Returns
+    -------
+    params : dict
+        Dictionary of the form ``{key : np.ndarray}`` where each array
+        is a contiguous view of one row of a single extracted array.
+
+    """
+    if isinstance(ephem, dict):
+        return ephem
+    row_indexes = [ephem.map[key] for key in keys]
+    params = np.ascontiguousarray(ephem.array[row_indexes, :],
+                                  dtype=np.float64)
+    return dict(zip(keys, params))
+
+
+def _compute_gpsweek_diff(gps_week, ephem_gps_week):
+    """Time between the start of the GPS week and the ephemeris week.
+
+    Weeks are compared modulo 1024 to handle week rollovers.
+
+    Parameters
+    ----------
+    gps_week : int or np.ndarray
+        Week of GPS calendar corresponding to time of clock.
+    ephem_gps_week : np.ndarray
+        GPS weeks of the ephemerides, the ``gps_week`` parameter
+        extracted with :code:`_unpack_ephem`.
+
+    Returns
+    -------
+    gpsweek_diff : np.ndarray
+        Difference between the GPS week and the ephemeris week [s].
+
+    """
+    return np.mod(gps_week,1024)*604800. \
+         - np.mod(ephem_gps_week,1024)*604800.
+
+
+def _compute_mean_motion(sqrt_sma):
+    """Mean angular motion of the satellite orbits.
+
+    Parameters
+    ----------
+    sqrt_sma : np.ndarray
+        Square root of the semi-major axes, the ``sqrtA`` parameter
+        extracted with :code:`_unpack_ephem` [sqrt(m)].
+
+    Returns
+    -------
+    sqrt_mu_a : np.ndarray
+        Mean angular motion without the ``deltaN`` correction [rad/s].
+
+    """
+    # cubing by multiplication instead of pow
+    return np.sqrt(consts.MU_EARTH) / (sqrt_sma*sqrt_sma*sqrt_sma)
+
+
+def _compute_eccentric_anomaly(gps_week, gps_tow, ephem, tol=1e-5, max_iter=10,
+                               sqrt_mu_a=None, delta_t=None):
     """Compute the eccentric anomaly from ephemeris parameters.
 
     This function extracts relevant parameters from the broadcast navigation
-    ephemerides and then solves the equation `f(E) = M - E + e * sin(E) = 0`
-    using the Newton-Raphson method.
+    ephemerides and then solves the equation `f(E) = E - e * sin(E) - M = 0`
+    using Halley's method.
 
     In the above equation `M` is the corrected mean anomaly, `e` is the
     orbit eccentricity and `E` is the eccentric anomaly, which is unknown.
@@ -359,13 +651,22 @@ def _compute_eccentric_anomaly(gps_week, gps_tow, ephem, tol=1e-5, max_iter=10):
         Week of GPS calendar corresponding to time of clock.
     gps_tow : np.ndarray
         GPS time of the week at which positions are required [s].
-    ephem : gnss_lib_py.navdata.navdata.NavData
+    ephem : gnss_lib_py.navdata.navdata.NavData or dict
         NavData instance containing ephemeris parameters of satellites
-        for which states are required.
+        for which states are required, or the parameters already
+        extracted with :code:`_unpack_ephem`.
     tol : float
-        Tolerance for convergence of the Newton-Raphson.
+        Tolerance on the update of the eccentric anomaly below which
+        the iterations stop [rad].
     max_iter : int
-        Maximum number of iterations for Newton-Raphson.
+        Maximum number of iterations of Halley's method.
+    sqrt_mu_a : np.ndarray
+        Mean angular motion if already computed by the caller, otherwise
+        computed from the ephemeris [rad/s].
+    delta_t : np.ndarray
+        Time since the time of ephemeris, including the difference of
+        GPS weeks, if already computed by the caller, otherwise
+        computed from `gps_week` and `gps_tow` [s].
 
     Returns
     -------
@@ -374,28 +675,56 @@ def _compute_eccentric_anomaly(gps_week, gps_tow, ephem, tol=1e-5, max_iter=10):
 
     """
     #Extract required parameters from ephemeris and GPS constants
+    ephem = _unpack_ephem(ephem, ('deltaN', 'M_0', 'sqrtA', 'e',
+                                  'gps_week', 't_oe'))
     delta_n   = ephem['deltaN']
     mean_anom_0  = ephem['M_0']
-    sqrt_sma = ephem['sqrtA'] # sqrt of semi-major axis
-    sqrt_mu_a = np.sqrt(consts.MU_EARTH) * sqrt_sma**-3 # mean angular motion
+    if sqrt_mu_a is None:
+        sqrt_mu_a = _compute_mean_motion(ephem['sqrtA'])
     ecc        = ephem['e']     # eccentricity
     #Times for computing positions
-    gpsweek_diff = (np.mod(gps_week,1024) - np.mod(ephem['gps_week'],1024))*604800.
-    delta_t = gps_tow - ephem['t_oe'] + gpsweek_diff
+    if delta_t is None:
+        gpsweek_diff = _compute_gpsweek_diff(gps_week, ephem['gps_week'])
+        delta_t = gps_tow - ephem['t_oe'] + gpsweek_diff
 
     # Calculate the mean anomaly with corrections
     mean_anom_corr = delta_n * delta_t
     mean_anom = mean_anom_0 + (sqrt_mu_a * delta_t) + mean_anom_corr
 
-    # Compute Eccentric Anomaly
-    ecc_anom = mean_anom
-    for _ in np.arange(0, max_iter):
-        fun = mean_anom - ecc_anom + ecc * np.sin(ecc_anom)
-        df_decc_anom = ecc*np.cos(ecc_anom) - 1.
-        delta_ecc_anom   = -fun / df_decc_anom
-        ecc_anom    = ecc_anom + delta_ecc_anom
-
-    if np.any(delta_ecc_anom > tol): #pragma: no cover
+    # Compute Eccentric Anomaly with Halley's method, updating
+    # preallocated buffers in place so that no temporary arrays are
+    # created in each iteration
+    mean_anom = np.array(mean_anom, dtype=np.float64, ndmin=1)
+    ecc = np.broadcast_to(np.asarray(ecc, dtype=np.float64),
+                          mean_anom.shape)
+    ecc_anom = mean_anom.copy()
+    fun = np.empty_like(ecc_anom)
+    d_fun = np.empty_like(ecc_anom)
+    dd_fun = np.empty_like(ecc_anom)
+    delta_ecc_anom = np.empty_like(ecc_anom)
+    for _ in range(max_iter):
+        # f = E - e*sin(E) - M and d2f/dE2 = e*sin(E)
+        np.sin(ecc_anom, out=dd_fun)
+        np.multiply(ecc, dd_fun, out=dd_fun)
+        np.subtract(ecc_anom, dd_fun, out=fun)
+        np.subtract(fun, mean_anom, out=fun)
+        # df/dE = 1 - e*cos(E)
+        np.cos(ecc_anom, out=d_fun)
+        np.multiply(ecc, d_fun, out=d_fun)
+        np.subtract(1., d_fun, out=d_fun)
+        # E = E - f*f'/(f'^2 - f*f''/2)
+        np.multiply(fun, dd_fun, out=dd_fun)
+        np.multiply(dd_fun, 0.5, out=dd_fun)
+        np.multiply(d_fun, d_fun, out=delta_ecc_anom)
+        np.subtract(delta_ecc_anom, dd_fun, out=delta_ecc_anom)
+        np.multiply(fun, d_fun, out=fun)
+        np.divide(fun, delta_ecc_anom, out=delta_ecc_anom)
+        np.subtract(ecc_anom, delta_ecc_anom, out=ecc_anom)
+        # the convergence is cubic, so the step after the last one
+        # below the tolerance would be negligible
+        if not np.any(np.abs(delta_ecc_anom) > tol):
+            break
+    else: #pragma: no cover
         raise RuntimeWarning("Eccentric Anomaly may not have converged" \
                             + f"after {max_iter} steps. : dE = {delta_ecc_anom}")
 
@@ -410,8 +739,9 @@ def _estimate_sv_clock_corr(gps_millis, ephem):
     gps_millis : int
         Time at which measurements are needed, measured in milliseconds
         since start of GPS epoch [ms].
-    ephem : gnss_lib_py.navdata.navdata.NavData
-        Satellite ephemeris parameters for measurement SVs.
+    ephem : gnss_lib_py.navdata.navdata.NavData or dict
+        Satellite ephemeris parameters for measurement SVs, or the
+        parameters already extracted with :code:`_unpack_ephem`.
 
     Returns
     -------
@@ -424,6 +754,7 @@ def _estimate_sv_clock_corr(gps_millis, ephem):
 
     """
     # Extract required GPS constants
+    ephem = _unpack_ephem(ephem, CLOCK_EPHEMERIS_ROWS)
     ecc        = ephem['e']     # eccentricity
     sqrt_sma = ephem['sqrtA'] # sqrt of semi-major axis
 
@@ -431,6 +762,10 @@ def _estimate_sv_clock_corr(gps_millis, ephem):
     #     delta_t = delta_t - np.sign(delta_t)*604800
 
     gps_week, gps_tow = gps_millis_to_tow(gps_millis)
+    # Keep the shape of the input times, so that a column of times
+    # broadcasts against the ephemeris parameters
+    gps_week = np.reshape(gps_week, np.shape(gps_millis))
+    gps_tow = np.reshape(gps_tow, np.shape(gps_millis))
 
     # Compute Eccentric Anomaly
     ecc_anom = _compute_eccentric_anomaly(gps_week, gps_tow, ephem)
@@ -522,16 +857,25 @@ def get_time_cropped_rinex(gps_millis, satellites=None,
                                  verbose=verbose)
     rinex_data = RinexNav(rinex_paths, satellites=satellites)
 
-    time_cropped_data = rinex_data.where('gps_millis', gps_millis, "lesser")
-
-    time_cropped_data = time_cropped_data.pandas_df().sort_values(
-        'gps_millis').groupby('gnss_sv_id').last()
-
-    rinex_data_df = time_cropped_data
-    rinex_iono_params = rinex_data.iono_params
-
-    rinex_data_df = rinex_data_df.reset_index()
-    rinex_data = NavData(pandas_df=rinex_data_df)
-    rinex_data.iono_params = rinex_iono_params
-
-    return rinex_data
+    # Find the latest ephemeris per satellite broadcast before the
+    # timestamp directly on the arrays, without a pandas round trip.
+    # gnss_sv_id is reduced on the numeric codes NavData stores for
+    # strings, which are assigned in sorted string order, so the
+    # strings never need to be decoded.
+    ephem_millis = rinex_data.array[rinex_data.map['gps_millis'], :]
+    sv_codes = rinex_data.array[rinex_data.map['gnss_sv_id'], :].astype(int)
+    before_idxs = np.flatnonzero(ephem_millis < gps_millis)
+    before_codes = sv_codes[before_idxs]
+    # stable sort by sv and then time, so the last entry of each sv
+    # group is its latest ephemeris and ties keep the file order
+    order = before_idxs[np.lexsort((ephem_millis[before_idxs],
+                                    before_codes))]
+    sorted_codes = sv_codes[order]
+    is_last = np.ones(order.size, dtype=bool)
+    is_last[:-1] = sorted_codes[1:] != sorted_codes[:-1]
+    latest_idxs = order[is_last]
+
+    time_cropped_data = rinex_data.copy(cols=latest_idxs)
+    time_cropped_data.iono_params = rinex_data.iono_params
+
+    return time_cropped_data
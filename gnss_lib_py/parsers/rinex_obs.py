@@ -3,15 +3,19 @@
 __authors__ = "Ashwin Kanhere"
 __date__ = "26 July 2023"
 
-from datetime import timezone
+import re
 
 import numpy as np
 import georinex as gr
 
 from gnss_lib_py.navdata.navdata import NavData
-import gnss_lib_py.utils.constants as consts
 from gnss_lib_py.utils.time_conversions import datetime_to_gps_millis
-from gnss_lib_py.navdata.operations import sort, concat
+from gnss_lib_py.navdata.operations import sort
+from gnss_lib_py.utils.gnss_sv_ids import split_gnss_sv_ids
+
+MEASURE_COLUMN_PATTERN = re.compile(r'^([CLDS])(\d[A-Z]?)$')
+"""re.Pattern : Measurement character and band of observation columns."""
+
 
 class RinexObs(NavData):
     """Class handling Rinex observation files [1]_.
@@ -48,76 +52,80 @@ class RinexObs(NavData):
         obs_file = gr.load(input_path).to_dataframe()
         obs_header = gr.rinexheader(input_path)
         obs_measure_types = obs_header['fields']
-        rx_bands = []
-        for rx_measures in obs_measure_types.values():
-            for single_measure in rx_measures:
-                band = single_measure[1:]
-                if band not in rx_bands:
-                    rx_bands.append(band)
+        # ordered unique bands across all constellations
+        rx_bands = list(dict.fromkeys(single_measure[1:]
+                        for rx_measures in obs_measure_types.values()
+                        for single_measure in rx_measures))
         obs_file.dropna(how='all', inplace=True)
         obs_file.reset_index(inplace=True)
-        # Convert time to gps_millis
-        datetime_series = [d.to_pydatetime().replace(tzinfo=timezone.utc)
-                           for d in obs_file["time"]]
-        obs_file['gps_millis'] = datetime_to_gps_millis(datetime_series)
+        # Convert time to gps_millis in one vectorized operation
+        obs_file['gps_millis'] = datetime_to_gps_millis(
+                                    obs_file["time"].to_numpy())
         obs_file = obs_file.drop(columns=['time'])
         obs_file = obs_file.rename(columns={"sv":"sv_id"})
         # Convert gnss_sv_id to gnss_id and sv_id (plus gnss_sv_id)
-        obs_navdata_raw = NavData(pandas_df=obs_file)
-        obs_navdata_raw['gnss_sv_id'] = obs_navdata_raw['sv_id']
-        gnss_chars = [sv_id[0] for sv_id in np.atleast_1d(obs_navdata_raw['sv_id'])]
-        gnss_nums = [sv_id[1:] for sv_id in np.atleast_1d(obs_navdata_raw['sv_id'])]
-        gnss_id = [consts.CONSTELLATION_CHARS[gnss_char] for gnss_char in gnss_chars]
-        obs_navdata_raw['gnss_id'] = np.asarray(gnss_id)
-        obs_navdata_raw['sv_id'] = np.asarray(gnss_nums, dtype=int)
-        # Convert the coded column names to glp standards and extract information
-        # into glp row and columns format
-        info_rows = ['gps_millis', 'gnss_sv_id', 'sv_id', 'gnss_id']
-        super().__init__()
+        gnss_sv_id = obs_file['sv_id'].to_numpy().astype(str)
+        gnss_id, sv_id = split_gnss_sv_ids(gnss_sv_id)
+        # Integer codes per constellation for signal_type lookup tables
+        constellations, gnss_codes = np.unique(gnss_id, return_inverse=True)
+        info_rows = {'gps_millis' : obs_file['gps_millis'].to_numpy(dtype=np.float64),
+                     'gnss_sv_id' : gnss_sv_id,
+                     'sv_id' : sv_id,
+                     'gnss_id' : gnss_id,
+                     }
+        # Convert the coded column names to glp standards and extract
+        # information into glp row and columns format. Each band's rows
+        # are gathered as arrays and concatenated once at the end.
+        measure_type_dict = self._measure_type_dict()
+        signal_type_dict = self._signal_type_dict()
+        missing_measure = np.full(len(obs_file), np.nan)
+        # Map (measure character, band) to column names in a single pass
+        measure_columns = {}
+        for column in obs_file.columns:
+            column_match = MEASURE_COLUMN_PATTERN.match(str(column))
+            if column_match is not None:
+                measure_columns[column_match.groups()] = column
+        band_rows = []
         for band in rx_bands:
-            rename_map = {}
-            keep_rows = info_rows.copy()
-            measure_type_dict = self._measure_type_dict()
+            measures = {}
             for measure_char, measure_row in measure_type_dict.items():
-                measure_band_row = measure_char + band
-                rename_map[measure_band_row] = measure_row
-                keep_rows.append(measure_char + band)
-                if measure_band_row not in obs_navdata_raw.rows:
-                    obs_navdata_raw[measure_band_row] = np.array(len(obs_navdata_raw)*[np.nan])
-            band_navdata = obs_navdata_raw.copy(rows=keep_rows)
-            band_navdata.rename(rename_map, inplace=True)
-            # Remove the cases with NaNs in the measurements
-            nan_indexes = np.argwhere(np.isnan(band_navdata[["carrier_phase",
-            	             "raw_doppler_hz",
-                             "cn0_dbhz"]]).all(axis=0))[:,0].tolist()
-            # Remove the cases with NaNs in the pseudorange
-            nan_indexes += np.argwhere(np.isnan(band_navdata[["raw_pr_m"
-                                                             ]]))[:,0].tolist()
-            nan_indexes = sorted(list(set(nan_indexes)))
-            if len(nan_indexes) > 0:
-                band_navdata.remove(cols=nan_indexes,inplace=True)
+                if (measure_char, band) in measure_columns:
+                    measure_band_row = measure_columns[(measure_char, band)]
+                    measures[measure_row] = obs_file[measure_band_row].to_numpy(
+                                                            dtype=np.float64)
+                else:
+                    measures[measure_row] = missing_measure
+            # Remove the cases with NaNs in all of carrier phase, doppler
+            # and cn0 as well as the cases with NaNs in the pseudorange,
+            # building one mask and gathering every row with its indices
+            all_missing = np.logical_and.reduce([np.isnan(measures[row])
+                                                 for row in ('carrier_phase',
+                                                             'raw_doppler_hz',
+                                                             'cn0_dbhz')])
+            all_missing |= np.isnan(measures['raw_pr_m'])
+            valid = np.flatnonzero(~all_missing)
+            band_row = {row : values[valid] for row, values in info_rows.items()}
+            for measure_row, values in measures.items():
+                band_row[measure_row] = values[valid]
 
-            # Assign the gnss_lib_py standard names for signal_type
-            rx_constellations = np.unique(band_navdata['gnss_id'])
-            signal_type_dict = self._signal_type_dict()
-            signal_types = np.empty(len(band_navdata), dtype=object)
-            observation_codes = np.empty(len(band_navdata), dtype=object)
-            for constellation in rx_constellations:
-                signal_type = signal_type_dict[constellation][band]
-                signal_types[band_navdata['gnss_id']==constellation] = signal_type
-                observation_codes[band_navdata['gnss_id']==constellation] = band
-            band_navdata['signal_type'] = signal_types
-            band_navdata['observation_code'] = observation_codes
-            if len(self) == 0:
-                concat_navdata = concat(self, band_navdata)
-            else:
-                concat_navdata = concat(self, band_navdata)
+            # Assign the gnss_lib_py standard names for signal_type by
+            # indexing a lookup table with the constellation codes
+            band_codes = gnss_codes[valid]
+            signal_type_lut = np.empty(len(constellations), dtype=object)
+            present = np.bincount(band_codes, minlength=len(constellations)) > 0
+            for code in np.flatnonzero(present):
+                signal_type_lut[code] = signal_type_dict[constellations[code]][band]
+            signal_types = signal_type_lut[band_codes]
+            band_row['signal_type'] = signal_types
+            band_row['observation_code'] = np.full(len(signal_types), band,
+                                                   dtype=object)
+            band_rows.append(band_row)
 
-            self.array = concat_navdata.array
-            self.map = concat_navdata.map
-            self.str_map = concat_navdata.str_map
-            self.orig_dtypes = concat_navdata.orig_dtypes.copy()
-            
+        super().__init__()
+        if len(band_rows) > 0:
+            for row in band_rows[0]:
+                self[row] = np.concatenate([band_row[row]
+                                            for band_row in band_rows])
         sort(self,'gps_millis', inplace=True)
 
     @staticmethod
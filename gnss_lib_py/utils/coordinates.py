@@ -589,15 +589,18 @@ def el_az_to_enu_unit_vector(el_deg, az_deg):
     unit_dir_mat : np.ndarray
         ENU unit vectors.
     """
-    el_rad = np.deg2rad(el_deg)
-    az_rad = np.deg2rad(az_deg)
-    
-    unit_dir_mat = np.vstack(
-        (np.atleast_2d(np.cos(el_rad) * np.sin(az_rad)),
-         np.atleast_2d(np.cos(el_rad) * np.cos(az_rad)),
-         np.atleast_2d(np.sin(el_rad))
-         )).T
-    
+    # Convert and take the sine and cosine of both angles together
+    angles_rad = np.deg2rad(np.stack(np.broadcast_arrays(np.ravel(el_deg),
+                                                         np.ravel(az_deg))))
+    sin_angles = np.sin(angles_rad)
+    cos_angles = np.cos(angles_rad)
+
+    # Fill the columns of the output directly
+    unit_dir_mat = np.empty((angles_rad.shape[1], 3))
+    np.multiply(cos_angles[0], sin_angles[1], out=unit_dir_mat[:, 0])
+    np.multiply(cos_angles[0], cos_angles[1], out=unit_dir_mat[:, 1])
+    unit_dir_mat[:, 2] = sin_angles[0]
+
     return unit_dir_mat
 
 
@@ -9,9 +9,22 @@ __date__ = "24 January, 2024"
 import numpy as np
 
 from gnss_lib_py.navdata.navdata import NavData
-from gnss_lib_py.navdata.operations import loop_time
 from gnss_lib_py.utils.coordinates import el_az_to_enu_unit_vector
 
+DEFAULT_WHICH_DOP = {'GDOP': False,
+                     'HDOP': True,
+                     'VDOP': True,
+                     'PDOP': False,
+                     'TDOP': False,
+                     'dop_matrix': False}
+"""dict : DOP values returned by get_dop unless selected otherwise."""
+
+SPLAT_ROWS = (0, 0, 0, 0, 1, 1, 1, 2, 2, 3)
+"""tuple : Matrix rows of the upper triangle entries kept when splatting."""
+
+SPLAT_COLS = (0, 1, 2, 3, 1, 2, 3, 2, 3, 3)
+"""tuple : Matrix columns of the upper triangle entries kept when splatting."""
+
 
 def get_enu_dop_labels():
     """
@@ -43,7 +56,9 @@ def get_dop(navdata, **which_dop):
         ``gps_millis``, ``el_sv_deg``, and ``az_sv_deg``
 
     which_dop : dict
-        Dictionary of which dop values are needed. Default is HDOP and VDOP.
+        Dictionary of which dop values are needed, given as keyword
+        arguments. Values not given are taken from
+        :code:`DEFAULT_WHICH_DOP`, which selects HDOP and VDOP.
 
         Note that the dop matrix output is splatted across entries following
         the behavior below:
@@ -74,69 +89,70 @@ def get_dop(navdata, **which_dop):
     navdata.in_rows(['gps_millis', 'el_sv_deg', 'az_sv_deg'])
 
     # Default which_dop values assume HDOP and VDOP are needed.
-    default_which_dop = {'GDOP': False,
-                         'HDOP': True,
-                         'VDOP': True,
-                         'PDOP': False,
-                         'TDOP': False,
-                         'dop_matrix': False}
-    # This syntax allows for the user to override the default values.
-    which_dop = {**default_which_dop, **which_dop}
-
-    # Initialize the gps_millis to output
-    times = []
-
-    # Initialize the dop to output
-    dop_out = {}
-    for dop_name, include_dop in which_dop.items():
-        if include_dop:
-            dop_out[dop_name] = []
-
-    # Loop through time in the navdata.
-    for timestamp, _, navdata_subset in loop_time(navdata, 'gps_millis'):
-        # Append the timestamp
-        times.append(timestamp)
-
-        # remove NaN indices
-        nan_indices = np.where(np.isnan(navdata_subset['el_sv_deg']) \
-                               | np.isnan(navdata_subset['az_sv_deg']))[0]
-        navdata_subset = navdata_subset.remove(None, nan_indices)
-
-        # Calculate the DOP at this time instance
-        dop = calculate_dop(navdata_subset)
-
-        # Append the DOP to the output
-        for dop_name, include_dop in which_dop.items():
-            if include_dop:
-                dop_out[dop_name].append(dop[dop_name])
-
-    # Create a new NavData instance to store the DOP
-    dop_navdata = NavData()
-    dop_navdata['gps_millis'] = np.array(times)
-
+    # This syntax allows for the user to override the default values
+    # without modifying either dictionary.
+    which_dop = {**DEFAULT_WHICH_DOP, **which_dop}
+
+    # Group the measurements by time, up to the same two decimal places
+    # as loop_time, so that all times are processed together. Sorting
+    # once makes each epoch a contiguous block that can be reduced
+    times = np.atleast_1d(navdata['gps_millis'])
+    rounded_times = np.around(times, decimals=2)
+    if np.all(rounded_times[1:] >= rounded_times[:-1]):
+        # Measurements are usually stored in time order already
+        time_order = slice(None)
+    else:
+        time_order = np.argsort(rounded_times, kind='stable')
+        times = times[time_order]
+        rounded_times = rounded_times[time_order]
+    epoch_starts = np.flatnonzero(np.concatenate(([True],
+                            rounded_times[1:] != rounded_times[:-1]))
+                            [:len(rounded_times)])
+    # Report the measurement time itself if it is the same for the
+    # whole epoch, otherwise the rounded time
+    time_min = np.minimum.reduceat(times, epoch_starts)
+    time_max = np.maximum.reduceat(times, epoch_starts)
+    epoch_times = np.where(time_min == time_max, time_min,
+                           rounded_times[epoch_starts])
+
+    # Sum the contribution of each satellite to the Gram matrix of its
+    # epoch, satellites with NaN elevation or azimuth contribute zeros.
+    # The Gram matrices are symmetric, so only the 10 entries of the
+    # upper triangle are summed, in the same order as splatted matrices
+    enut_matrix = _calculate_enut_matrix(navdata)[time_order]
+    enut_matrix[np.isnan(enut_matrix).any(axis=1), :] = 0.
+    outer_products = enut_matrix[:, SPLAT_ROWS] * enut_matrix[:, SPLAT_COLS]
+    gram_matrices = unsplat_dop_matrix(np.add.reduceat(outer_products,
+                                                       epoch_starts, axis=0))
+    num_epochs = len(epoch_starts)
+
+    # Calculate the DOP at all times at once
+    dop = parse_dop(_invert_gram_matrices(gram_matrices))
+
+    # Collect the values of all requested DOP rows
+    dop_rows = {'gps_millis' : epoch_times}
     for dop_name, include_dop in which_dop.items():
         # We need to handle the dop_matrix separately
         if include_dop and dop_name != 'dop_matrix':
-            dop_navdata[dop_name] = np.array(dop_out[dop_name])
+            dop_rows[dop_name] = dop[dop_name]
 
     # Special handling for splatting the dop_matrix
     if which_dop['dop_matrix']:
 
         dop_labels = get_enu_dop_labels()
 
-        dop_matrix_splat = []
-
-        for dop_matrix in dop_out['dop_matrix']:
-            dop_matrix_splat.append(splat_dop_matrix(dop_matrix))
-
-        # Convert entire array across time to numpy array
-        dop_matrix_splat = np.array(dop_matrix_splat)
-        assert dop_matrix_splat.shape == (len(times), len(dop_labels)), \
+        # Splat the DOP matrices at all times together
+        dop_matrix_splat = splat_dop_matrix(dop['dop_matrix'])
+        assert dop_matrix_splat.shape == (num_epochs, len(dop_labels)), \
             f"DOP matrix splatted to {dop_matrix_splat.shape}."
 
-        # Add to the NavData instance
-        for dop_ind, dop_label in enumerate(dop_labels):
-            dop_navdata[f'dop_{dop_label}'] = dop_matrix_splat[:, dop_ind]
+        for dop_label, dop_values in zip(dop_labels, dop_matrix_splat.T):
+            dop_rows[f'dop_{dop_label}'] = dop_values
+
+    # Create a new NavData instance to store the DOP, with all rows
+    # added together instead of stacking the array once per row
+    dop_navdata = NavData()
+    dop_navdata.add_rows(dop_rows)
 
     return dop_navdata
 
@@ -166,17 +182,18 @@ def splat_dop_matrix(dop_matrix):
     Parameters
     ----------
     dop_matrix : np.ndarray
-        DOP matrix in ENU coordinates of size (4, 4).
+        DOP matrix in ENU coordinates of size (4, 4), or DOP matrices
+        at several times of size (T, 4, 4).
 
     Returns
     -------
     dop_splat : np.ndarray
-        DOP matrix splatted into a 1D array of size (10,).
+        DOP matrix splatted into a 1D array of size (10,), or of size
+        (T, 10) for several times.
     """
 
     # Splat the DOP matrix
-    dop_splat = dop_matrix[(0, 0, 0, 0, 1, 1, 1, 2, 2, 3),
-                           (0, 1, 2, 3, 1, 2, 3, 2, 3, 3)]
+    dop_splat = dop_matrix[..., SPLAT_ROWS, SPLAT_COLS]
 
     return np.array(dop_splat)
 
@@ -205,30 +222,30 @@ def unsplat_dop_matrix(dop_splat):
     Parameters
     ----------
     dop_splat : np.ndarray
-        DOP matrix splatted into a 1D array of size (10,).
+        DOP matrix splatted into a 1D array of size (10,), or of size
+        (T, 10) for several times.
 
     Returns
     -------
     dop_matrix : np.ndarray
-        DOP matrix in ENU coordinates of size (4, 4).
+        DOP matrix in ENU coordinates of size (4, 4), or of size
+        (T, 4, 4) for several times.
     """
 
     # Un-splat the DOP matrix
-    dop_matrix = np.zeros((4, 4))
-
-    splat_rows = (0, 0, 0, 0, 1, 1, 1, 2, 2, 3)
-    splat_cols = (0, 1, 2, 3, 1, 2, 3, 2, 3, 3)
+    dop_splat = np.asarray(dop_splat)
+    dop_matrix = np.zeros(dop_splat.shape[:-1] + (4, 4))
 
     # Fill in the upper triangle of the DOP matrix
-    dop_matrix[splat_rows, splat_cols] = dop_splat
+    dop_matrix[..., SPLAT_ROWS, SPLAT_COLS] = dop_splat
     # Fill in the lower triangle of the DOP matrix
     # (Note that the diagonal is filled in again, but that's okay.)
-    dop_matrix[splat_cols, splat_rows] = dop_splat
+    dop_matrix[..., SPLAT_COLS, SPLAT_ROWS] = dop_splat
 
     return dop_matrix
 
 
-def calculate_enu_dop_matrix(derived):
+def calculate_enu_dop_matrix(derived, enu_unit_vectors=None):
     """
     Calculate the DOP matrix from elevation and azimuth (ENU).
 
@@ -238,6 +255,10 @@ def calculate_enu_dop_matrix(derived):
         NavData instance containing received GNSS measurements for a
         particular time instance, contains elevation and azimuth angle
         information for an estimated location.
+    enu_unit_vectors : np.ndarray
+        ENU unit vectors to the satellites of size (num_satellites, 3)
+        if already computed from the elevation and azimuth in
+        `derived`, otherwise computed from `derived`.
 
     Returns
     -------
@@ -247,15 +268,11 @@ def calculate_enu_dop_matrix(derived):
 
     # Use the elevation and azimuth angles to get the ENU and Time matrix
     # Each row is [d_e, d_n, d_u, 1] for each satellite.
-    enut_matrix = _calculate_enut_matrix(derived)
+    enut_matrix = _calculate_enut_matrix(derived, enu_unit_vectors)
     enut_gram_matrix = enut_matrix.T @ enut_matrix
 
-    # Calculate the DOP matrix
-    try:
-        dop_matrix = np.linalg.inv(enut_gram_matrix)
-    except np.linalg.LinAlgError:
-        # If the matrix is singular, return NaNs for the DOP
-        dop_matrix = np.nan * np.ones((4, 4))
+    # Calculate the DOP matrix, which is NaN if the matrix is singular
+    dop_matrix = _invert_gram_matrices(enut_gram_matrix[np.newaxis])[0]
 
     return dop_matrix
 
@@ -266,25 +283,33 @@ def parse_dop(dop_matrix):
     Parameters
     ----------
     dop_matrix : np.ndarray
-        DOP matrix in ENU coordinates of size (4, 4).
+        DOP matrix in ENU coordinates of size (4, 4), or DOP matrices
+        at several times of size (T, 4, 4).
 
     Returns
     -------
     dop : Dict
         Dilution of precision, with DOP type as the keys: "HDOP", "VDOP",
-        "TDOP", "PDOP", "GDOP".
+        "TDOP", "PDOP", "GDOP". Each DOP has size (T,) if the DOP
+        matrices at several times are given.
     """
 
     dop = {}
     dop["dop_matrix"] = dop_matrix
 
-    dop["GDOP"] = _safe_sqrt(np.trace(dop_matrix))
-    dop["HDOP"] = _safe_sqrt(dop_matrix[0, 0] + dop_matrix[1, 1])
-    dop["VDOP"] = _safe_sqrt(dop_matrix[2, 2])
-    dop["PDOP"] = _safe_sqrt(dop_matrix[0, 0] + \
-                             dop_matrix[1, 1] + \
-                             dop_matrix[2, 2])
-    dop["TDOP"] = _safe_sqrt(dop_matrix[3, 3])
+    # Take the square roots of all DOP types in a single call, which
+    # matters for the many small arrays of a single time instance
+    diagonal = np.diagonal(dop_matrix, axis1=-2, axis2=-1)
+    horizontal = diagonal[..., 0] + diagonal[..., 1]
+    position = horizontal + diagonal[..., 2]
+    dop_values = _safe_sqrt(np.stack((position + diagonal[..., 3],
+                                      horizontal,
+                                      diagonal[..., 2],
+                                      position,
+                                      diagonal[..., 3])))
+    for dop_name, dop_value in zip(("GDOP", "HDOP", "VDOP", "PDOP", "TDOP"),
+                                   dop_values):
+        dop[dop_name] = dop_value
 
     return dop
 
@@ -295,18 +320,47 @@ def _safe_sqrt(x):
 
     Parameters
     ----------
-    x : float
-        Value to take the square root of.
+    x : float or np.ndarray
+        Value(s) to take the square root of.
+
+    Returns
+    -------
+    y : float or np.ndarray
+        Square root of x, or NaN where x is negative.
+    """
+    # Negative values are replaced before the square root, which does
+    # not warn for NaNs
+    return np.sqrt(np.where(x >= 0, x, np.nan))[()]
+
+
+def _invert_gram_matrices(gram_matrices, det_tol=1e-12):
+    """
+    Invert the ENUT Gram matrices at all times to get the DOP matrices.
+
+    Parameters
+    ----------
+    gram_matrices : np.ndarray
+        Gram matrices of the ENU and Time matrices of size (T, 4, 4).
+    det_tol : float
+        Gram matrices with a determinant smaller than this in absolute
+        value are treated as singular.
 
     Returns
     -------
-    y : float
-        Square root of x, or NaN if x is negative.
+    dop_matrices : np.ndarray
+        DOP matrices of size (T, 4, 4), filled with NaNs at times where
+        the Gram matrix is singular.
     """
-    return np.sqrt(x) if x >= 0 else np.nan
+    # Mask singular matrices up front instead of catching LinAlgError,
+    # so that all others are still inverted in a single call
+    singular = ~(np.abs(np.linalg.det(gram_matrices)) >= det_tol)
+    dop_matrices = np.full_like(gram_matrices, np.nan)
+    dop_matrices[~singular] = np.linalg.inv(gram_matrices[~singular])
+
+    return dop_matrices
 
 
-def calculate_dop(derived):
+def calculate_dop(derived, enu_unit_vectors=None):
     """
     Calculate the DOP from elevation and azimuth (ENU).
 
@@ -316,6 +370,10 @@ def calculate_dop(derived):
         NavData instance containing received GNSS measurements for a
         particular time instance, contains elevation and azimuth angle
         information for an estimated location.
+    enu_unit_vectors : np.ndarray
+        ENU unit vectors to the satellites of size (num_satellites, 3)
+        if already computed from the elevation and azimuth in
+        `derived`, otherwise computed from `derived`.
 
     Returns
     -------
@@ -325,7 +383,7 @@ def calculate_dop(derived):
     """
 
     # Calculate the DOP matrix
-    dop_matrix = calculate_enu_dop_matrix(derived)
+    dop_matrix = calculate_enu_dop_matrix(derived, enu_unit_vectors)
 
     # Parse the DOP matrix to get the DOP values
     dop = parse_dop(dop_matrix)
@@ -333,7 +391,7 @@ def calculate_dop(derived):
     return dop
 
 
-def _calculate_enut_matrix(derived):
+def _calculate_enut_matrix(derived, enu_unit_vectors=None):
     """
     Calculate the ENU and Time Matrix from elevation and azimuth.
     Each row is [d_e, d_n, d_u, 1] for each satellite.
@@ -344,6 +402,10 @@ def _calculate_enut_matrix(derived):
         NavData instance containing received GNSS measurements for a
         particular time instance, contains elevation and azimuth angle
         information for an estimated location.
+    enu_unit_vectors : np.ndarray
+        ENU unit vectors to the satellites of size (num_satellites, 3)
+        if already computed from the elevation and azimuth in
+        `derived`, otherwise computed from `derived`.
 
     Returns
     -------
@@ -351,9 +413,13 @@ def _calculate_enut_matrix(derived):
         Matrix of ENU and Time vectors of size (num_satellites, 4).
 
     """
-    enu_unit_dir_mat = el_az_to_enu_unit_vector(derived['el_sv_deg'],
-                                                derived['az_sv_deg'])
-    enut_matrix = np.hstack((enu_unit_dir_mat,
-                             np.ones((enu_unit_dir_mat.shape[0], 1))))
+    if enu_unit_vectors is None:
+        enu_unit_vectors = el_az_to_enu_unit_vector(derived['el_sv_deg'],
+                                                    derived['az_sv_deg'])
+    # Fill a preallocated contiguous matrix instead of stacking a
+    # separate column of ones
+    enut_matrix = np.empty((enu_unit_vectors.shape[0], 4))
+    enut_matrix[:, :3] = enu_unit_vectors
+    enut_matrix[:, 3] = 1.
 
     return enut_matrix
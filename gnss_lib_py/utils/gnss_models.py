@@ -18,7 +18,7 @@ from gnss_lib_py.utils.coordinates import ecef_to_geodetic, ecef_to_el_az
 from gnss_lib_py.navdata.navdata import NavData
 from gnss_lib_py.utils.time_conversions import gps_millis_to_tow
 from gnss_lib_py.utils.sv_models import find_visible_ephem, _extract_pos_vel_arr, \
-                        find_sv_location, find_sv_states, \
+                        _extract_pos_arr, find_sv_location, find_sv_states, \
                         find_visible_sv_posvel, _sort_ephem_measures, \
                         _filter_ephemeris_measurements
 from gnss_lib_py.utils.ephemeris_downloader import DEFAULT_EPHEM_PATH
@@ -493,8 +493,7 @@ def _calculate_tropo_delay(gps_millis, rx_ecef, ephem=None, sv_posvel=None):
         assert ephem is not None, "Must provide ephemeris or positions" \
                         + " to find troposphere delay"
         sv_posvel = find_sv_states(gps_millis, ephem)
-    sv_pos, _ = _extract_pos_vel_arr(sv_posvel)
-    sv_pos = sv_pos.reshape(3, -1)
+    sv_pos = _extract_pos_arr(sv_posvel)
 
     # compute elevation and azimuth
     el_az = ecef_to_el_az(rx_ecef, sv_pos)
@@ -571,8 +570,7 @@ def _calculate_iono_delay(gps_millis, iono_params, rx_ecef, ephem=None,
         assert ephem is not None, "Must provide ephemeris or positions" \
                                 + " to find visible satellites"
         sv_posvel = find_sv_states(gps_millis, ephem)
-    sv_pos, _ = _extract_pos_vel_arr(sv_posvel)
-    sv_pos = sv_pos.reshape(3, -1)
+    sv_pos = _extract_pos_arr(sv_posvel)
     el_az = ecef_to_el_az(rx_ecef, sv_pos)
     el_r = np.deg2rad(el_az[0, :])
     az_r = np.deg2rad(el_az[1, :])
@@ -0,0 +1,44 @@
+"""Handle standard `gnss_sv_id` satellite identifiers.
+
+Identifiers such as 'G01' or 'R12' combine the constellation character
+and the satellite number, as used in Rinex files.
+
+"""
+
+__authors__ = "Ashwin Kanhere, Shubh Gupta"
+__date__ = "13 July 2021"
+
+import numpy as np
+
+import gnss_lib_py.utils.constants as consts
+
+
+def split_gnss_sv_ids(gnss_sv_ids):
+    """Split standard `gnss_sv_id` strings into `gnss_id` and `sv_id`.
+
+    Splits strings like 'G01' or 'R12' into the constellation name and
+    the integer satellite number. Each unique identifier is parsed once
+    into a lookup table which is then indexed for every entry.
+
+    Parameters
+    ----------
+    gnss_sv_ids : str or np.ndarray
+        Satellite identifiers of the form 'G01', 'E11', 'R06', etc.
+
+    Returns
+    -------
+    gnss_id : np.ndarray
+        Constellation names, for example 'gps' or 'galileo'.
+    sv_id : np.ndarray
+        Integer satellite numbers within each constellation.
+
+    """
+    gnss_sv_ids = np.atleast_1d(gnss_sv_ids).astype(str)
+    unique_ids, inverse = np.unique(gnss_sv_ids, return_inverse=True)
+    gnss_id_lut = np.array([consts.CONSTELLATION_CHARS[unique_id[0]]
+                            for unique_id in unique_ids], dtype=str)
+    # only the leading digits are the satellite number, georinex adds
+    # suffixes such as '_1' for repeated messages
+    sv_id_lut = np.array([int(unique_id[1:].split('_')[0])
+                          for unique_id in unique_ids], dtype=int)
+    return gnss_id_lut[inverse], sv_id_lut[inverse]
@@ -16,12 +16,25 @@ from gnss_lib_py.navdata.navdata import NavData
 from gnss_lib_py.parsers.rinex_nav import get_time_cropped_rinex, RinexNav
 from gnss_lib_py.parsers.rinex_nav import _compute_eccentric_anomaly
 from gnss_lib_py.parsers.rinex_nav import _estimate_sv_clock_corr
+from gnss_lib_py.parsers.rinex_nav import _unpack_ephem, CLOCK_EPHEMERIS_ROWS
+from gnss_lib_py.parsers.rinex_nav import _compute_gpsweek_diff
+from gnss_lib_py.parsers.rinex_nav import _compute_mean_motion
 import gnss_lib_py.utils.constants as consts
 from gnss_lib_py.utils.coordinates import ecef_to_el_az
 from gnss_lib_py.utils.time_conversions import gps_millis_to_tow
 from gnss_lib_py.utils.ephemeris_downloader import DEFAULT_EPHEM_PATH, load_ephemeris
 from gnss_lib_py.navdata.operations import loop_time, sort, concat, find_wildcard_indexes
 
+KEPLER_EPHEMERIS_ROWS = CLOCK_EPHEMERIS_ROWS + ('C_is', 'C_ic', 'C_rs',
+                                               'C_rc', 'C_uc', 'C_us',
+                                               'omega', 'Omega_0',
+                                               'OmegaDot', 'IDOT', 'i_0')
+"""tuple : Ephemeris rows needed to propagate orbits and clocks."""
+
+SV_STATE_ROWS = ('x_sv_m', 'y_sv_m', 'z_sv_m',
+                 'vx_sv_mps', 'vy_sv_mps', 'vz_sv_mps', 'b_sv_m')
+"""tuple : Rows of SV positions, velocities and clock biases."""
+
 def add_sv_states(navdata, source = 'precise', file_paths = None,
                   download_directory = DEFAULT_EPHEM_PATH,
                   verbose = False):
@@ -283,11 +296,13 @@ def svs_from_el_az(elaz_deg):
     assert np.shape(elaz_deg)[0] == 2, "elaz_deg should be a 2xN array"
     el_deg = np.deg2rad(elaz_deg[0, :])
     az_deg = np.deg2rad(elaz_deg[1, :])
-    unit_vect = np.zeros([3, np.shape(elaz_deg)[1]])
-    unit_vect[0, :] = np.sin(az_deg)*np.cos(el_deg)
-    unit_vect[1, :] = np.cos(az_deg)*np.cos(el_deg)
-    unit_vect[2, :] = np.sin(el_deg)
-    svs_ned = 20200000*unit_vect
+    cos_el = np.cos(el_deg)
+    # Fill the output directly and scale it in place
+    svs_ned = np.empty([3, np.shape(elaz_deg)[1]])
+    np.multiply(np.sin(az_deg), cos_el, out=svs_ned[0, :])
+    np.multiply(np.cos(az_deg), cos_el, out=svs_ned[1, :])
+    np.sin(el_deg, out=svs_ned[2, :])
+    svs_ned *= 20200000
     return svs_ned
 
 
@@ -356,8 +371,145 @@ def find_sv_states(gps_millis, ephem):
 
     """
 
+    # Extract all parameters once for both the orbit and clock models
+    params = _unpack_ephem(ephem, KEPLER_EPHEMERIS_ROWS)
+    return _find_sv_states_unpacked(gps_millis, ephem, params)
+
+
+def find_sv_states_batch(gps_millis, ephem):
+    """Compute positions and velocities of all satellites at many times.
+
+    Propagates every satellite in `ephem` to every time in `gps_millis`
+    in one vectorized pass over a (times x satellites) grid, instead of
+    calling :code:`find_sv_states` once per time.
+
+    `ephem` must contain the same rows as required by
+    :code:`find_sv_states`.
+
+    Parameters
+    ----------
+    gps_millis : float or np.ndarray
+        Times at which states are needed, measured in milliseconds
+        since start of GPS epoch [ms].
+    ephem : gnss_lib_py.navdata.navdata.NavData
+        NavData instance containing ephemeris parameters of satellites
+        for which states are required.
+
+    Returns
+    -------
+    sv_posvel : gnss_lib_py.navdata.navdata.NavData
+        NavData containing satellite positions, velocities, corresponding
+        time with GNSS ID and SV number. Has ``len(gps_millis)*len(ephem)``
+        columns with the states of all satellites at the first time
+        followed by those at the second time and so on.
+
+    """
+    gps_millis = np.atleast_1d(np.asarray(gps_millis, dtype=np.float64))
+    num_times = len(gps_millis)
+    num_svs = len(ephem)
+    # Times along the first axis broadcast against ephemeris parameters
+    # along the second axis
+    grid_millis = gps_millis.reshape(-1, 1)
+    gps_week, gps_tow = gps_millis_to_tow(gps_millis)
+    gps_week = np.reshape(gps_week, grid_millis.shape)
+    gps_tow = np.reshape(gps_tow, grid_millis.shape)
+
+    params = _unpack_ephem(ephem, KEPLER_EPHEMERIS_ROWS)
+    states = _propagate_kepler(gps_week, gps_tow, params)
+    clock_corr, _, _ = _estimate_sv_clock_corr(grid_millis, params)
+
+    sv_posvel = NavData()
+    sv_posvel['gnss_id'] = np.tile(np.atleast_1d(ephem['gnss_id']), num_times)
+    sv_posvel['sv_id'] = np.tile(np.atleast_1d(ephem['sv_id']), num_times)
+    sv_posvel['gps_millis'] = np.repeat(gps_millis, num_svs)
+    sv_posvel.add_rows({row : np.broadcast_to(values,
+                                              (num_times, num_svs)).ravel()
+                        for row, values in zip(SV_STATE_ROWS,
+                                               states + (clock_corr,))})
+    return sv_posvel
+
+
+def _find_sv_states_unpacked(gps_millis, ephem, params):
+    """Compute satellite states from already extracted parameters.
+
+    Parameters
+    ----------
+    gps_millis : int
+        Time at which measurements are needed, measured in milliseconds
+        since start of GPS epoch [ms].
+    ephem : gnss_lib_py.navdata.navdata.NavData
+        NavData instance containing ephemeris parameters of satellites
+        for which states are required.
+    params : dict
+        Parameters of `ephem` extracted with :code:`_unpack_ephem` for
+        :code:`KEPLER_EPHEMERIS_ROWS`.
+
+    Returns
+    -------
+    sv_posvel : gnss_lib_py.navdata.navdata.NavData
+        NavData containing satellite positions, velocities, corresponding
+        time with GNSS ID and SV number.
+
+    """
     # Convert time from GPS millis to TOW
     gps_week, gps_tow = gps_millis_to_tow(gps_millis)
+
+    sv_posvel = NavData()
+    sv_posvel['gnss_id'] = ephem['gnss_id']
+    sv_posvel['sv_id'] = ephem['sv_id']
+    # Deal with times being a single value or a vector with the same
+    # length as the ephemeris
+    sv_posvel['gps_millis'] = gps_millis
+
+    states = _propagate_kepler(gps_week, gps_tow, params)
+
+    # Estimate SV clock corrections, including polynomial and relativistic
+    # clock corrections
+    clock_corr, _, _ = _estimate_sv_clock_corr(gps_millis, params)
+
+    sv_posvel.add_rows(dict(zip(SV_STATE_ROWS, states + (clock_corr,))))
+
+    return sv_posvel
+
+
+def _propagate_kepler(gps_week, gps_tow, ephem):
+    """Propagate broadcast Keplerian orbits to the given time.
+
+    Holds the array math of :code:`find_sv_states` apart from the
+    construction of the output NavData. All operations are elementwise,
+    so the times broadcast against the ephemeris parameters the same way
+    as the inputs of a NumPy ufunc: a (T, 1) column of times with (N,)
+    parameters gives (T, N) states, as used by
+    :code:`find_sv_states_batch`.
+
+    Parameters
+    ----------
+    gps_week : int or np.ndarray
+        Week of GPS calendar corresponding to time of clock.
+    gps_tow : float or np.ndarray
+        GPS time of the week at which positions are required [s],
+        broadcastable against the ephemeris parameters.
+    ephem : dict
+        Ephemeris parameters of satellites for which states are
+        required, as extracted with :code:`_unpack_ephem`.
+
+    Returns
+    -------
+    sv_x : np.ndarray
+        ECEF satellite x positions [m], with the broadcast shape of
+        the times and ephemeris parameters.
+    sv_y : np.ndarray
+        ECEF satellite y positions [m].
+    sv_z : np.ndarray
+        ECEF satellite z positions [m].
+    sv_vx : np.ndarray
+        ECEF satellite x velocities [m/s].
+    sv_vy : np.ndarray
+        ECEF satellite y velocities [m/s].
+    sv_vz : np.ndarray
+        ECEF satellite z velocities [m/s].
+
+    """
     # Extract parameters
 
     c_is = ephem['C_is']
@@ -374,37 +526,37 @@ def find_sv_states(gps_millis, ephem):
     sqrt_sma = ephem['sqrtA'] # sqrt of semi-major axis
     sma      = sqrt_sma**2      # semi-major axis
 
-    sqrt_mu_a = np.sqrt(consts.MU_EARTH) * sqrt_sma**-3 # mean angular motion
-    gpsweek_diff = (np.mod(gps_week,1024) - np.mod(ephem['gps_week'],1024))*604800.
-    sv_posvel = NavData()
-    sv_posvel['gnss_id'] = ephem['gnss_id']
-    sv_posvel['sv_id'] = ephem['sv_id']
-    # Deal with times being a single value or a vector with the same
-    # length as the ephemeris
-    sv_posvel['gps_millis'] = gps_millis
-
-    delta_t = gps_tow - ephem['t_oe'] + gpsweek_diff
+    # mean angular motion, shared with the eccentric anomaly
+    sqrt_mu_a = _compute_mean_motion(sqrt_sma)
+    # time since the start of the ephemeris week, shared by the time
+    # since the time of ephemeris and the rotation of the Earth
+    tow_eff = gps_tow + _compute_gpsweek_diff(gps_week, ephem['gps_week'])
+    delta_t = tow_eff - ephem['t_oe']
 
     # Calculate the mean anomaly with corrections
-    ecc_anom = _compute_eccentric_anomaly(gps_week, gps_tow, ephem)
+    ecc_anom = _compute_eccentric_anomaly(gps_week, gps_tow, ephem,
+                                          sqrt_mu_a=sqrt_mu_a,
+                                          delta_t=delta_t)
 
     cos_e   = np.cos(ecc_anom)
     sin_e   = np.sin(ecc_anom)
     e_cos_e = (1 - ecc*cos_e)
 
-    # Calculate the true anomaly from the eccentric anomaly
-    sin_nu = np.sqrt(1 - ecc**2) * (sin_e/e_cos_e)
-    cos_nu = (cos_e-ecc) / e_cos_e
-    nu_rad     = np.arctan2(sin_nu, cos_nu)
+    # Calculate the true anomaly from the eccentric anomaly. Both sine
+    # and cosine share the positive factor 1/(1 - e*cos(E)), which
+    # arctan2 does not depend on, so it is left out
+    sqrt_1_e2 = np.sqrt(1 - ecc*ecc)
+    nu_rad     = np.arctan2(sqrt_1_e2*sin_e, cos_e - ecc)
 
-    # Calcualte the argument of latitude iteratively
+    # Calcualte the argument of latitude iteratively. The correction is
+    # at most ~1e-5 rad, so the fixed point is reached to double
+    # precision after two updates and they are written out directly.
     phi_0 = nu_rad + omega
-    phi   = phi_0
-    for incl in range(5):
-        cos_to_phi = np.cos(2.*phi)
-        sin_to_phi = np.sin(2.*phi)
-        phi_corr = c_uc * cos_to_phi + c_us * sin_to_phi
-        phi = phi_0 + phi_corr
+    phi   = phi_0 + c_uc * np.cos(2.*phi_0) + c_us * np.sin(2.*phi_0)
+    cos_to_phi = np.cos(2.*phi)
+    sin_to_phi = np.sin(2.*phi)
+    phi_corr = c_uc * cos_to_phi + c_us * sin_to_phi
+    phi = phi_0 + phi_corr
 
     # Calculate the longitude of ascending node with correction
     omega_corr = ephem['OmegaDot'] * delta_t
@@ -414,7 +566,7 @@ def find_sv_states(gps_millis, ephem):
 
     # Also correct for the rotation since the beginning of the GPS week for
     # which the Omega0 is defined.  Correct for GPS week rollovers.
-    omega = omega_0 - (consts.OMEGA_E_DOT*(gps_tow + gpsweek_diff)) + omega_corr
+    omega = omega_0 - (consts.OMEGA_E_DOT*tow_eff) + omega_corr
 
     # Calculate orbital radius with correction
     r_corr = c_rc * cos_to_phi + c_rs * sin_to_phi
@@ -424,7 +576,7 @@ def find_sv_states(gps_millis, ephem):
     ######  Lines added for velocity (1)  ######
     ############################################
     delta_e   = (sqrt_mu_a + delta_n) / e_cos_e
-    dphi = np.sqrt(1 - ecc**2)*delta_e / e_cos_e
+    dphi = sqrt_1_e2*delta_e / e_cos_e
     # Changed from the paper
     delta_r   = (sma * ecc * delta_e * sin_e) + 2*(c_rs*cos_to_phi - c_rc*sin_to_phi)*dphi
 
@@ -437,49 +589,41 @@ def find_sv_states(gps_millis, ephem):
     ############################################
     delta_i = 2*(c_is*cos_to_phi - c_ic*sin_to_phi)*dphi + ephem['IDOT']
 
+    # Evaluate the sines and cosines of the argument of latitude, the
+    # longitude of the ascending node and the inclination with one call
+    # each on the stacked angles instead of six separate passes
+    angles = np.stack(np.broadcast_arrays(phi, omega, incl))
+    sin_phi, sin_omega, sin_i = np.sin(angles)
+    cos_phi, cos_omega, cos_i = np.cos(angles)
+
     # Find the position in the orbital plane
-    x_plane = orb_radius*np.cos(phi)
-    y_plane = orb_radius*np.sin(phi)
+    x_plane = orb_radius*cos_phi
+    y_plane = orb_radius*sin_phi
 
     ############################################
     ######  Lines added for velocity (3)  ######
     ############################################
     delta_u = (1 + 2*(c_us * cos_to_phi - c_uc*sin_to_phi))*dphi
-    dxp = delta_r*np.cos(phi) - orb_radius*np.sin(phi)*delta_u
-    dyp = delta_r*np.sin(phi) + orb_radius*np.cos(phi)*delta_u
+    dxp = delta_r*cos_phi - orb_radius*sin_phi*delta_u
+    dyp = delta_r*sin_phi + orb_radius*cos_phi*delta_u
     # Find satellite position in ECEF coordinates
-    cos_omega = np.cos(omega)
-    sin_omega = np.sin(omega)
-    cos_i = np.cos(incl)
-    sin_i = np.sin(incl)
-
-    sv_posvel['x_sv_m'] = x_plane*cos_omega - y_plane*cos_i*sin_omega
-    sv_posvel['y_sv_m'] = x_plane*sin_omega + y_plane*cos_i*cos_omega
-    sv_posvel['z_sv_m'] = y_plane*sin_i
+    y_incl = y_plane*cos_i
+    sv_x = x_plane*cos_omega - y_incl*sin_omega
+    sv_y = x_plane*sin_omega + y_incl*cos_omega
+    sv_z = y_plane*sin_i
 
     ############################################
     ######  Lines added for velocity (4)  ######
     ############################################
+    # The rotation of the node reuses the ECEF positions, and the in
+    # plane velocity rotated by the inclination is shared by vx and vy
     omega_dot = ephem['OmegaDot'] - consts.OMEGA_E_DOT
-    sv_posvel['vx_sv_mps'] = (dxp * cos_omega
-                         - dyp * cos_i*sin_omega
-                         + y_plane  * sin_omega*sin_i*delta_i
-                         - (x_plane * sin_omega + y_plane*cos_i*cos_omega)*omega_dot)
-
-    sv_posvel['vy_sv_mps'] = (dxp * sin_omega
-                         + dyp * cos_i * cos_omega
-                         - y_plane  * sin_i * cos_omega * delta_i
-                         + (x_plane * cos_omega - (y_plane*cos_i*sin_omega)) * omega_dot)
-
-    sv_posvel['vz_sv_mps'] = dyp*sin_i + y_plane*cos_i*delta_i
-
-    # Estimate SV clock corrections, including polynomial and relativistic
-    # clock corrections
-    clock_corr, _, _ = _estimate_sv_clock_corr(gps_millis, ephem)
+    dy_incl = dyp*cos_i - sv_z*delta_i
+    sv_vx = dxp*cos_omega - dy_incl*sin_omega - sv_y*omega_dot
+    sv_vy = dxp*sin_omega + dy_incl*cos_omega + sv_x*omega_dot
+    sv_vz = dyp*sin_i + y_incl*delta_i
 
-    sv_posvel['b_sv_m'] = clock_corr
-
-    return sv_posvel
+    return sv_x, sv_y, sv_z, sv_vx, sv_vy, sv_vz
 
 
 def find_visible_ephem(gps_millis, rx_ecef, ephem, el_mask=5.):
@@ -507,11 +651,11 @@ def find_visible_ephem(gps_millis, rx_ecef, ephem, el_mask=5.):
     # Find positions and velocities of all satellites
     approx_posvel = find_sv_states(gps_millis - 1000.*consts.T_TRANS, ephem)
     # Find elevation and azimuth angles for all satellites
-    approx_pos, _ = _extract_pos_vel_arr(approx_posvel)
+    approx_pos = _extract_pos_arr(approx_posvel)
     approx_el_az = ecef_to_el_az(np.reshape(rx_ecef, [3, 1]), approx_pos)
     # Keep attributes of only those satellites which are visible
     keep_ind = approx_el_az[0,:] > el_mask
-    eph = ephem.copy(cols=np.nonzero(keep_ind))
+    eph = ephem.copy(cols=np.flatnonzero(keep_ind))
     return eph
 
 
@@ -534,14 +678,12 @@ def find_visible_sv_posvel(rx_ecef, sv_posvel, el_mask=5.):
         SV states of satellites that are visible
 
     """
-    # Find positions and velocities of all satellites
-    approx_posvel = sv_posvel.copy()
     # Find elevation and azimuth angles for all satellites
-    approx_pos, _ = _extract_pos_vel_arr(approx_posvel)
+    approx_pos = _extract_pos_arr(sv_posvel)
     approx_el_az = ecef_to_el_az(np.reshape(rx_ecef, [3, 1]), approx_pos)
     # Keep attributes of only those satellites which are visible
     keep_ind = approx_el_az[0,:] > el_mask
-    vis_posvel = sv_posvel.copy(cols=np.nonzero(keep_ind))
+    vis_posvel = sv_posvel.copy(cols=np.flatnonzero(keep_ind))
     return vis_posvel
 
 def find_sv_location(gps_millis, rx_ecef, ephem=None, sv_posvel=None, get_iono=False):
@@ -576,12 +718,18 @@ def find_sv_location(gps_millis, rx_ecef, ephem=None, sv_posvel=None, get_iono=F
     if sv_posvel is None:
         assert ephem is not None, "Must provide ephemeris or positions" \
                                 + " to find satellites states"
-        sv_posvel = find_sv_states(gps_millis - 1000.*consts.T_TRANS, ephem)
+        params = _unpack_ephem(ephem, KEPLER_EPHEMERIS_ROWS)
+        sv_posvel = _find_sv_states_unpacked(gps_millis - 1000.*consts.T_TRANS,
+                                             ephem, params)
         del_pos, true_range = _find_delxyz_range(sv_posvel, rx_ecef)
         t_corr = true_range/consts.C
 
-        # Find satellite locations at (a more accurate) time of transmission
-        sv_posvel = find_sv_states(gps_millis-1000.*t_corr, ephem)
+        # Find satellite locations at (a more accurate) time of
+        # transmission by moving the states over the few milliseconds
+        # between both times instead of propagating the orbits again
+        _extrapolate_sv_states(sv_posvel, consts.T_TRANS - t_corr,
+                               params['SVclockDrift'])
+        sv_posvel['gps_millis'] = gps_millis - 1000.*t_corr
     del_pos, true_range = _find_delxyz_range(sv_posvel, rx_ecef)
     t_corr = true_range/consts.C
 
@@ -733,6 +881,32 @@ def _extract_pos_vel_arr(sv_posvel):
     return sv_pos, sv_vel
 
 
+def _extract_pos_arr(sv_posvel):
+    """Extract satellite positions from the NavData array.
+
+    Reads the position rows straight from the underlying array, which
+    gives a view without copying when they are stored next to each
+    other, as they are in the output of :code:`find_sv_states`.
+
+    Parameters
+    ----------
+    sv_posvel : gnss_lib_py.navdata.navdata.NavData
+        NavData containing satellite position states.
+
+    Returns
+    -------
+    sv_pos : np.ndarray
+        ECEF satellite x, y and z positions 3xN [m]. May share memory
+        with `sv_posvel` and must not be modified.
+    """
+    row_x = sv_posvel.map['x_sv_m']
+    if sv_posvel.map['y_sv_m'] == row_x + 1 \
+        and sv_posvel.map['z_sv_m'] == row_x + 2:
+        return sv_posvel.array[row_x:row_x + 3, :]
+    return sv_posvel.array[[row_x, sv_posvel.map['y_sv_m'],
+                            sv_posvel.map['z_sv_m']], :]
+
+
 def _find_delxyz_range(sv_posvel, rx_ecef):
     """Return difference of satellite and rx_pos positions and distance between them.
 
@@ -751,13 +925,51 @@ def _find_delxyz_range(sv_posvel, rx_ecef):
         Distance between satellite and receiver positions.
     """
     rx_ecef = np.reshape(rx_ecef, [3, 1])
-    satellites = len(sv_posvel)
-    sv_pos, _ = _extract_pos_vel_arr(sv_posvel)
-    sv_pos = sv_pos.reshape(rx_ecef.shape[0], satellites)
-    del_pos = sv_pos - np.tile(rx_ecef, (1, satellites))
-    true_range = np.linalg.norm(del_pos, axis=0)
+    sv_pos = _extract_pos_arr(sv_posvel)
+    # Broadcast the receiver position instead of tiling it
+    del_pos = sv_pos - rx_ecef
+    true_range = np.einsum('ij,ij->j', del_pos, del_pos)
+    np.sqrt(true_range, out=true_range)
     return del_pos, true_range
 
+
+def _extrapolate_sv_states(sv_posvel, delta_t, clock_drift):
+    """Move satellite states forward by a short time in place.
+
+    Positions and velocities are extrapolated to second order with the
+    two body gravitational acceleration plus the centrifugal and
+    Coriolis terms of the rotating ECEF frame. Over the tens of
+    milliseconds of signal travel time this is within a millimeter and
+    0.1 mm/s of propagating the broadcast orbit again.
+
+    Parameters
+    ----------
+    sv_posvel : gnss_lib_py.navdata.navdata.NavData
+        Satellite positions, velocities and clock biases, updated in
+        place.
+    delta_t : float or np.ndarray
+        Time by which to move each satellite state [s].
+    clock_drift : np.ndarray
+        Satellite clock drift from the broadcast ephemeris [s/s].
+
+    """
+    # Read and update all state rows in the underlying array at once
+    row_indexes = [sv_posvel.map[row] for row in SV_STATE_ROWS]
+    states = sv_posvel.array[row_indexes, :]
+    sv_pos = states[0:3, :]
+    sv_vel = states[3:6, :]
+    radius = np.sqrt(np.einsum('ij,ij->j', sv_pos, sv_pos))
+    sv_acc = -consts.MU_EARTH / radius**3 * sv_pos
+    sv_acc[:2, :] += consts.OMEGA_E_DOT**2 * sv_pos[:2, :]
+    sv_acc[0, :] += 2.*consts.OMEGA_E_DOT * sv_vel[1, :]
+    sv_acc[1, :] -= 2.*consts.OMEGA_E_DOT * sv_vel[0, :]
+
+    sv_pos += sv_vel*delta_t + 0.5*sv_acc*delta_t**2
+    sv_vel += sv_acc*delta_t
+    states[6, :] += consts.C*clock_drift*delta_t
+    sv_posvel.array[row_indexes, :] = states
+
+
 def single_gnss_from_precise_eph(navdata, sp3_parsed_file,
                                  clk_parsed_file, inplace=False,
                                  verbose = False):
@@ -45,6 +45,12 @@ LEAPSECONDS_TABLE = [datetime(2017, 1, 1, 0, 0, tzinfo=timezone.utc),
                      datetime(1981, 7, 1, 0, 0, tzinfo=timezone.utc),
                      GPS_EPOCH_0]
 
+# LEAPSECONDS_TABLE as timezone naive UTC datetime64 in ascending order
+# for vectorized lookups with np.searchsorted
+LEAPSECONDS_DATETIME64 = np.array([np.datetime64(t.replace(tzinfo=None), 'ns')
+                                   for t in LEAPSECONDS_TABLE[::-1]])
+GPS_EPOCH_0_DATETIME64 = np.datetime64(GPS_EPOCH_0.replace(tzinfo=None), 'ns')
+
 
 def get_leap_seconds(gps_time):
     """Compute leap seconds to be added in time conversions.
@@ -356,10 +362,14 @@ def datetime_to_gps_millis(t_datetimes):
     Leap seconds are always added because UTC time is adjusted for leap
     seconds while GPS milliseconds are not.
 
+    If a ``np.ndarray`` with a ``np.datetime64`` dtype is given, the
+    times are interpreted as UTC and converted in a single vectorized
+    operation instead of one ``datetime.datetime`` at a time.
+
     Parameters
     ----------
     t_datetime : datetime.datetime or array-like of datetime.datetime
-        UTC time as a datetime object.
+        UTC time as a datetime object or array of np.datetime64.
 
     Returns
     -------
@@ -369,11 +379,49 @@ def datetime_to_gps_millis(t_datetimes):
 
 
     """
+    if isinstance(t_datetimes, np.ndarray) \
+        and np.issubdtype(t_datetimes.dtype, np.datetime64):
+        return _datetime64_to_gps_millis(t_datetimes)
     gps_weeks, tows = datetime_to_tow(t_datetimes)
     gps_millis = tow_to_gps_millis(gps_weeks, tows)
     return gps_millis
 
 
+def _datetime64_to_gps_millis(t_datetime64):
+    """Vectorized conversion of UTC np.datetime64 to GPS milliseconds.
+
+    Parameters
+    ----------
+    t_datetime64 : np.ndarray
+        Array of timezone naive np.datetime64 in UTC time.
+
+    Returns
+    -------
+    gps_millis : float or np.ndarray
+        Milliseconds since GPS Epoch (6th January 1980 GPS). Either
+        `float` or `np.ndarray` with `dtype = float`.
+
+    """
+    t_ns = np.atleast_1d(t_datetime64).astype('datetime64[ns]')
+    if np.any(t_ns < GPS_EPOCH_0_DATETIME64):
+        raise RuntimeError("Input time must be after GPS epoch " \
+                         + str(GPS_EPOCH_0))
+    leap_secs = np.searchsorted(LEAPSECONDS_DATETIME64, t_ns,
+                                side='right') - 1
+    # truncate to microseconds to match datetime.datetime precision and
+    # split into week and time of week in the same way as datetime_to_tow
+    micros = (t_ns - GPS_EPOCH_0_DATETIME64).astype(np.int64) // 1000 \
+           + 1000000 * leap_secs
+    gps_weeks, tow_micros = np.divmod(micros, WEEKSEC * 1000000)
+    gps_millis = tow_to_gps_millis(gps_weeks, tow_micros / 1e6)
+    # missing times (NaT) become NaN instead of a large negative value
+    is_nat = np.isnat(t_ns)
+    if np.any(is_nat):
+        gps_millis = np.where(np.reshape(is_nat, np.shape(gps_millis)),
+                              np.nan, gps_millis)
+    return gps_millis
+
+
 def unix_millis_to_datetime(unix_millis):
     """Convert milliseconds since UNIX epoch (1/1/1970) to UTC datetime.
 
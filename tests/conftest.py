@@ -7,6 +7,7 @@ __date__ = "30 Apr 2022"
 
 
 import os
+import copy
 import pytest
 import numpy as np
 import pandas as pd
@@ -49,7 +50,7 @@ def pytest_collection_modifyitems(items):
 
     items[:] = sorted_items
 
-@pytest.fixture(name="root_path")
+@pytest.fixture(name="root_path", scope="session")
 def fixture_root_path():
     """Location of unit test directory.
 
@@ -64,7 +65,7 @@ def fixture_root_path():
     root_path = os.path.join(root_path, 'data/unit_test')
     return root_path
 
-@pytest.fixture(name="derived_path")
+@pytest.fixture(name="derived_path", scope="session")
 def fixture_derived_path(root_path):
     """Filepath of Android Derived 2022 measurements
 
@@ -147,9 +148,12 @@ def fixture_ephemeris_path(root_path):
     ephemeris_path = os.path.join(root_path)
     return ephemeris_path
 
-@pytest.fixture(name="android_derived")
-def fixture_derived(derived_path):
-    """Instance of Android Derived measurements, loaded into AndroidDerived2022.
+@pytest.fixture(name="android_derived_session", scope="session")
+def fixture_derived_session(derived_path):
+    """Instance of Android Derived measurements, loaded once per session.
+
+    Tests should use the ``android_derived`` fixture instead, which
+    returns a copy that can be modified.
 
     Parameters
     ----------
@@ -167,6 +171,22 @@ def fixture_derived(derived_path):
         derived[row] = 0
     return derived
 
+@pytest.fixture(name="android_derived")
+def fixture_derived(android_derived_session):
+    """Instance of Android Derived measurements, loaded into AndroidDerived2022.
+
+    Parameters
+    ----------
+    android_derived_session : gnss_lib_py.parsers.google_decimeter.AndroidDerived2022
+        Android Derived measurements loaded once per session.
+
+    Returns
+    -------
+    derived : gnss_lib_py.parsers.google_decimeter.AndroidDerived2022
+        Android Derived measurements for testing
+    """
+    return copy.deepcopy(android_derived_session)
+
 
 @pytest.fixture(name="android_gps_l1")
 def fixture_derived_gps_l1(android_derived):
@@ -712,7 +732,7 @@ def fixture_load_derived_xl(derived_path_xl):
                                  remove_timing_outliers=False)
     return derived_xl
 
-@pytest.fixture(name="derived_2022_path")
+@pytest.fixture(name="derived_2022_path", scope="session")
 def fixture_derived_2022_path(root_path):
     """Filepath of Android Derived measurements
 
@@ -743,9 +763,12 @@ def fixture_derived_2022_path(root_path):
 
 
 
-@pytest.fixture(name="derived_2022")
-def fixture_load_derived_2022(derived_2022_path):
-    """Load instance of AndroidDerived2022
+@pytest.fixture(name="derived_2022_session", scope="session")
+def fixture_load_derived_2022_session(derived_2022_path):
+    """Load instance of AndroidDerived2022 once per session
+
+    Tests should use the ``derived_2022`` fixture instead, which
+    returns a copy that can be modified.
 
     Parameters
     ----------
@@ -760,6 +783,22 @@ def fixture_load_derived_2022(derived_2022_path):
     derived = AndroidDerived2022(derived_2022_path)
     return derived
 
+@pytest.fixture(name="derived_2022")
+def fixture_load_derived_2022(derived_2022_session):
+    """Load instance of AndroidDerived2022
+
+    Parameters
+    ----------
+    derived_2022_session : pytest.fixture
+    Instance of AndroidDerived2022 loaded once per session
+
+    Returns
+    -------
+    derived : AndroidDerived2022
+    Instance of AndroidDerived2022 for testing
+    """
+    return copy.deepcopy(derived_2022_session)
+
 
 @pytest.fixture(name="gtruth")
 def fixture_load_gtruth(root_path):
@@ -1721,3 +1721,80 @@ def test_nan_return():
     x_output = navdata["x"]
     np.testing.assert_array_equal(np.isnan(x_output),
                                   np.array([False, True, False, True, False]))
+
+def test_add_rows(data):
+    """Test adding multiple numeric rows at once.
+
+    Parameters
+    ----------
+    data : gnss_lib_py.navdata.navdata.NavData
+        Instance of NavData
+
+    """
+    expected = data.copy()
+    expected["new_floats"] = np.linspace(0., 1., 6)
+    expected["new_ints"] = np.arange(6)
+    expected["new_scalar"] = 2.
+
+    data.add_rows({"new_floats" : np.linspace(0., 1., 6),
+                   "new_ints" : np.arange(6),
+                   "new_scalar" : 2.})
+    assert data.rows == expected.rows
+    assert data.orig_dtypes == expected.orig_dtypes
+    np.testing.assert_array_equal(data.array, expected.array)
+    pd.testing.assert_frame_equal(data.pandas_df(), expected.pandas_df())
+
+    # rows can be added to empty NavData
+    empty_data = NavData()
+    empty_data.add_rows({"x" : np.arange(3.), "y" : np.ones(3)})
+    assert empty_data.shape == (2, 3)
+    np.testing.assert_array_equal(empty_data["y"], np.ones(3))
+
+    with pytest.raises(KeyError):
+        data.add_rows({"new_floats" : np.zeros(6)})
+    with pytest.raises(AssertionError):
+        data.add_rows({"more_strings" : np.array(["gps"]*6, dtype=object)})
+
+def test_copy_independent(data):
+    """Test that copies do not share values with the original.
+
+    Parameters
+    ----------
+    data : gnss_lib_py.navdata.navdata.NavData
+        Instance of NavData
+
+    """
+    data_copy = data.copy(cols=np.nonzero(data["integers"] > 0))
+    np.testing.assert_array_equal(data_copy["strings"],
+                                  data["strings"][data["integers"] > 0])
+
+    data_copy["integers"] = 0
+    data_copy["strings"] = np.array(["beidou"]*len(data_copy), dtype=object)
+    assert np.all(data["integers"] != 0)
+    assert "beidou" not in data["strings"]
+    assert "beidou" not in data.str_map["strings"].values()
+
+def test_copy_slice_duplicates(data, df_simple):
+    """Test copies with sliced columns and repeated rows.
+
+    Parameters
+    ----------
+    data : gnss_lib_py.navdata.navdata.NavData
+        Instance of NavData
+    df_simple : pd.DataFrame
+        Dataframe that is sliced to compare copies against
+
+    """
+    new_data = data.copy(cols=slice(1, 3))
+    subset_df = df_simple.iloc[1:3, :].reset_index(drop=True)
+    pd.testing.assert_frame_equal(new_data.pandas_df(), subset_df,
+                                  check_dtype=False)
+
+    new_data = data.copy(rows=['strings', 'floats', 'strings'],
+                         cols=slice(None, None, 2))
+    assert new_data.rows == ['strings', 'floats']
+    assert new_data.shape == (2, 3)
+    subset_df = df_simple.loc[::2, ['strings', 'floats']]
+    pd.testing.assert_frame_equal(new_data.pandas_df(),
+                                  subset_df.reset_index(drop=True),
+                                  check_dtype=False)
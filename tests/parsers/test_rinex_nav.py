@@ -12,10 +12,18 @@ import pytest
 import numpy as np
 
 from gnss_lib_py.navdata.navdata import NavData
+import gnss_lib_py.utils.constants as consts
 from gnss_lib_py.parsers.rinex_nav import RinexNav, get_time_cropped_rinex
+from gnss_lib_py.parsers.rinex_nav import _load_rinex_header, _cached_rinex_header
+from gnss_lib_py.parsers.rinex_nav import _load_rinex_dataframe, _cached_rinex_dataframe
+from gnss_lib_py.parsers.rinex_nav import _compute_eccentric_anomaly, _unpack_ephem
+from gnss_lib_py.parsers.rinex_nav import _compute_gpsweek_diff
+from gnss_lib_py.parsers.rinex_nav import _compute_mean_motion
 from gnss_lib_py.utils.time_conversions import gps_millis_to_tow
 from gnss_lib_py.utils.time_conversions import datetime_to_gps_millis
 
+# pylint: disable=protected-access
+
 
 @pytest.fixture(name="ephem_path", scope='session')
 def fixture_ephem_path():
@@ -206,6 +214,25 @@ def test_no_iono_params(ephem_path):
                                    "BRDM00DLR_S_20230730000_01D_MN_no_gps_iono.rnx")
     RinexNav(rinex_path)
 
+def test_iono_params_without_satellites(ephem_path):
+    """Test iono params are kept for files without requested satellites.
+
+    Parameters
+    ----------
+    ephem_path : string
+        Location where ephemeris files are stored/to be downloaded to.
+
+    """
+
+    rinex_paths = [os.path.join(ephem_path,"rinex","nav",rinex_file)
+                   for rinex_file in ["brdc1360.20n", "brdc1370.20n"]]
+    all_data = RinexNav(rinex_paths)
+    # brdc1360.20n only contains G02
+    rinex_data = RinexNav(rinex_paths, satellites=["G03"])
+    assert np.all(rinex_data['gnss_sv_id'] == "G03")
+    assert rinex_data.iono_params.keys() == all_data.iono_params.keys()
+    assert len(rinex_data.iono_params) == 2
+
 def test_nan_removal(ephem_path):
     """Test that NaN values are being removed appropriately.
 
@@ -220,3 +247,137 @@ def test_nan_removal(ephem_path):
                                    "brdc0730.17n")
     rinex_data = RinexNav(rinex_path)
     assert rinex_data.shape == (36,4)
+
+def test_load_rinex_header(ephem_path):
+    """Test that cached Rinex headers are reused but not shared.
+
+    Parameters
+    ----------
+    ephem_path : string
+        Location where ephemeris files are stored/to be downloaded to.
+
+    """
+    rinex_path = os.path.join(ephem_path,"rinex","nav",
+                                   "brdc1370.20n")
+    header = _load_rinex_header(rinex_path, use_cache=True)
+    hits = _cached_rinex_header.cache_info().hits
+    header_again = _load_rinex_header(rinex_path, use_cache=True)
+    assert _cached_rinex_header.cache_info().hits == hits + 1
+    assert header == header_again
+
+    # modifying the returned header must not change the cached header
+    header_again['ION ALPHA'] = None
+    assert _load_rinex_header(rinex_path, use_cache=True)['ION ALPHA'] \
+        == header['ION ALPHA']
+
+def test_load_rinex_dataframe(ephem_path):
+    """Test that cached Rinex DataFrames are reused but not shared.
+
+    Parameters
+    ----------
+    ephem_path : string
+        Location where ephemeris files are stored/to be downloaded to.
+
+    """
+    rinex_path = os.path.join(ephem_path,"rinex","nav",
+                                   "brdc1370.20n")
+    data = _load_rinex_dataframe(rinex_path, {'G'}, use_cache=True)
+    hits = _cached_rinex_dataframe.cache_info().hits
+    data_again = _load_rinex_dataframe(rinex_path, {'G'}, use_cache=True)
+    assert _cached_rinex_dataframe.cache_info().hits == hits + 1
+    assert data.equals(data_again)
+
+    # modifying the returned DataFrame must not change the cached one
+    data_again['sqrtA'] = 0.
+    assert _load_rinex_dataframe(rinex_path, {'G'},
+                                 use_cache=True).equals(data)
+
+    # by default loading neither reads nor fills the cache
+    cache_info = _cached_rinex_dataframe.cache_info()
+    assert _load_rinex_dataframe(rinex_path, {'G'}).equals(data)
+    rinex_data = RinexNav(rinex_path)
+    assert _cached_rinex_dataframe.cache_info() == cache_info
+    assert rinex_data.shape == RinexNav(rinex_path, use_cache=True).shape
+
+    RinexNav.clear_cache()
+    assert _cached_rinex_dataframe.cache_info().currsize == 0
+    assert _cached_rinex_header.cache_info().currsize == 0
+
+def test_compute_eccentric_anomaly(ephem_path):
+    """Test that the eccentric anomaly solves Kepler's equation.
+
+    Parameters
+    ----------
+    ephem_path : string
+        Location where ephemeris files are stored/to be downloaded to.
+
+    """
+    rinex_path = os.path.join(ephem_path,"rinex","nav",
+                                   "brdc1370.20n")
+    ephem = RinexNav(rinex_path)
+    gps_week, gps_tow = gps_millis_to_tow(ephem['gps_millis'] + 1000.)
+    ecc_anom = _compute_eccentric_anomaly(gps_week, gps_tow, ephem)
+    assert ecc_anom.shape == (len(ephem),)
+
+    # recompute the mean anomaly to check M = E - e*sin(E)
+    delta_t = gps_tow - ephem['t_oe'] \
+            + (np.mod(gps_week,1024) - np.mod(ephem['gps_week'],1024))*604800.
+    mean_motion = np.sqrt(consts.MU_EARTH) / ephem['sqrtA']**3 + ephem['deltaN']
+    mean_anom = ephem['M_0'] + mean_motion*delta_t
+    np.testing.assert_allclose(ecc_anom - ephem['e']*np.sin(ecc_anom),
+                               mean_anom, rtol=0, atol=1e-12)
+
+def test_unpack_ephem(ephem_path):
+    """Test extraction of ephemeris rows into a dictionary of arrays.
+
+    Parameters
+    ----------
+    ephem_path : string
+        Location where ephemeris files are stored/to be downloaded to.
+
+    """
+    rinex_path = os.path.join(ephem_path,"rinex","nav",
+                                   "brdc1370.20n")
+    ephem = RinexNav(rinex_path)
+    keys = ('sqrtA', 'e', 'gps_week')
+    params = _unpack_ephem(ephem, keys)
+    assert tuple(params.keys()) == keys
+    for key in keys:
+        assert params[key].dtype == np.float64
+        assert params[key].flags['C_CONTIGUOUS']
+        np.testing.assert_array_equal(params[key], ephem[key])
+    # already extracted parameters are passed through unchanged
+    assert _unpack_ephem(params, keys) is params
+
+    # rows are contiguous even if the NavData array is not
+    ephem.array = np.asfortranarray(ephem.array)
+    for key, values in _unpack_ephem(ephem, keys).items():
+        assert values.flags['C_CONTIGUOUS']
+        np.testing.assert_array_equal(values, ephem[key])
+
+    with pytest.raises(KeyError):
+        _unpack_ephem(ephem, ('not_a_row',))
+
+def test_compute_gpsweek_diff():
+    """Test week differences across rollovers.
+
+    """
+    params = {'gps_week' : np.array([2105., 1081., 2104.])}
+    gpsweek_diff = _compute_gpsweek_diff(2105, params['gps_week'])
+    np.testing.assert_array_equal(gpsweek_diff, [0., 0., 604800.])
+    # the parameters are not modified
+    assert list(params.keys()) == ['gps_week']
+
+    params['gps_week'] = np.zeros(3)
+    np.testing.assert_array_equal(_compute_gpsweek_diff(2106,
+                                                        params['gps_week']),
+                                  np.full(3, 58*604800.))
+
+def test_compute_mean_motion():
+    """Test the mean motion of the orbits.
+
+    """
+    sqrt_sma = np.array([5153.6, 5440.6])
+    np.testing.assert_allclose(_compute_mean_motion(sqrt_sma),
+                               np.sqrt(consts.MU_EARTH) / sqrt_sma**3)
+
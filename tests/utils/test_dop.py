@@ -14,7 +14,7 @@ from pytest_lazyfixture import lazy_fixture
 import numpy as np
 
 from gnss_lib_py.navdata.navdata import NavData
-from gnss_lib_py.navdata.operations import loop_time
+from gnss_lib_py.navdata.operations import loop_time, concat
 
 from gnss_lib_py.utils.dop import \
         get_enu_dop_labels, get_dop, calculate_dop, \
@@ -143,6 +143,12 @@ def test_simple_dop(navdata, expected_dop):
     assert dop_dict.keys() == {'dop_matrix',
                                'GDOP', 'HDOP', 'VDOP', 'PDOP', 'TDOP'}
 
+    # Precomputed ENU unit vectors give the same DOP
+    enu_unit_vectors = _calculate_enut_matrix(navdata)[:, :3]
+    np.testing.assert_array_equal(
+        calculate_dop(navdata, enu_unit_vectors)['dop_matrix'],
+        dop_dict['dop_matrix'])
+
     # Check the DOP output has the expected values
 
     # Assert symmetry
@@ -337,6 +343,15 @@ def test_unsplat_dop_matrix(navdata, expected_dop):
     np.testing.assert_array_almost_equal(
         dop_matrix_unsplat, dop_matrix)
 
+    # Stacks of DOP matrices are splatted and unsplatted together
+    dop_matrix_stack = np.stack((dop_matrix, 2*dop_matrix))
+    dop_matrix_splat_stack = splat_dop_matrix(dop_matrix_stack)
+    assert dop_matrix_splat_stack.shape == (2, 10)
+    np.testing.assert_array_equal(dop_matrix_splat_stack[1],
+                                  2*dop_matrix_splat)
+    np.testing.assert_array_almost_equal(
+        unsplat_dop_matrix(dop_matrix_splat_stack), dop_matrix_stack)
+
 
 #############################################
 # Singularity issues and edge cases
@@ -426,6 +441,34 @@ def test_singularity_dop(navdata):
             assert np.all(np.isnan(val))
 
 
+def test_singularity_get_dop(simple_sat_scenario, singularity_sat_scenario):
+    """
+    Test that only singular times give NaNs when computed together.
+
+    Parameters
+    ----------
+    simple_sat_scenario : NavData
+        A NavData with only one time entry of a simple satellite scenario.
+    singularity_sat_scenario : NavData
+        A NavData with only one time entry of a **singular** satellite
+        scenario.
+
+    """
+    singular_navdata = singularity_sat_scenario.copy()
+    singular_navdata['gps_millis'] = 1000
+    navdata = concat(simple_sat_scenario, singular_navdata)
+
+    dop_navdata = get_dop(navdata, dop_matrix=True)
+
+    np.testing.assert_array_equal(dop_navdata['gps_millis'], [0, 1000])
+    np.testing.assert_array_almost_equal(
+        dop_navdata['HDOP', 0], calculate_dop(simple_sat_scenario)['HDOP'])
+    for row in dop_navdata.rows:
+        if row != 'gps_millis':
+            assert np.isfinite(dop_navdata[row, 0])
+            assert np.isnan(dop_navdata[row, 1])
+
+
 #############################################
 # Real data tests across time
 
@@ -541,6 +584,51 @@ def test_dop_across_time_with_selection(navdata, which_dop):
                 np.sqrt(dop_navdata['dop_tt']))
 
 
+@pytest.mark.parametrize('navdata',
+                        [
+                            lazy_fixture('android_derived')
+                        ])
+def test_dop_across_time_matches_single_time(navdata):
+    """
+    Test that DOP computed for all times at once matches each time alone.
+
+    Parameters
+    ----------
+    navdata : NavData
+        A NavData with multiple timesteps (i.e., as in real data).
+    """
+    # Satellites without elevation are ignored
+    navdata = navdata.copy()
+    el_sv_deg = navdata['el_sv_deg']
+    el_sv_deg[::5] = np.nan
+    navdata['el_sv_deg'] = el_sv_deg
+
+    dop_navdata = get_dop(navdata, GDOP=True, PDOP=True, TDOP=True,
+                          dop_matrix=True)
+
+    # The order of the measurements does not matter
+    reversed_navdata = navdata.copy(cols=np.arange(len(navdata))[::-1])
+    dop_navdata_reversed = get_dop(reversed_navdata, GDOP=True, PDOP=True,
+                                   TDOP=True, dop_matrix=True)
+    assert dop_navdata_reversed.rows == dop_navdata.rows
+    for row in dop_navdata.rows:
+        np.testing.assert_array_almost_equal(dop_navdata_reversed[row],
+                                             dop_navdata[row])
+
+    for time_idx, (timestamp, _, navdata_subset) \
+            in enumerate(loop_time(navdata, 'gps_millis')):
+        assert dop_navdata['gps_millis', time_idx] == timestamp
+        not_nan = ~np.isnan(navdata_subset['el_sv_deg'])
+        dop = calculate_dop(navdata_subset.copy(cols=np.flatnonzero(not_nan)))
+        for dop_name in ['GDOP', 'HDOP', 'VDOP', 'PDOP', 'TDOP']:
+            np.testing.assert_almost_equal(dop_navdata[dop_name, time_idx],
+                                           dop[dop_name])
+        dop_matrix_splat = np.array([dop_navdata[f"dop_{label}", time_idx]
+                                     for label in get_enu_dop_labels()])
+        np.testing.assert_array_almost_equal(
+            dop_matrix_splat, splat_dop_matrix(dop['dop_matrix']))
+
+
 @pytest.mark.parametrize('navdata',
                         [
                             lazy_fixture('android_derived')
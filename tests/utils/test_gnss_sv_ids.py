@@ -0,0 +1,35 @@
+"""Tests for handling standard gnss_sv_id satellite identifiers.
+
+"""
+
+__authors__ = "Ashwin Kanhere"
+__date__ = "30 Aug 2022"
+
+import pytest
+import numpy as np
+
+from gnss_lib_py.utils.gnss_sv_ids import split_gnss_sv_ids
+
+
+def test_split_gnss_sv_ids():
+    """Test splitting gnss_sv_id strings into gnss_id and sv_id.
+
+    """
+    gnss_sv_ids = np.array(['G01', 'R12', 'E5', 'C100', 'J07'])
+    gnss_id, sv_id = split_gnss_sv_ids(gnss_sv_ids)
+    np.testing.assert_array_equal(gnss_id, np.array(['gps', 'glonass',
+                                  'galileo', 'beidou', 'qzss']))
+    np.testing.assert_array_equal(sv_id, np.array([1, 12, 5, 100, 7]))
+
+    # georinex suffixes repeated Galileo messages, e.g. 'E01_1'
+    gnss_sv_ids = np.array(['E01', 'E01_1', 'E02_1'], dtype=object)
+    gnss_id, sv_id = split_gnss_sv_ids(gnss_sv_ids)
+    np.testing.assert_array_equal(gnss_id, np.array(['galileo']*3))
+    np.testing.assert_array_equal(sv_id, np.array([1, 1, 2]))
+
+    gnss_id, sv_id = split_gnss_sv_ids('S23')
+    np.testing.assert_array_equal(gnss_id, np.array(['sbas']))
+    np.testing.assert_array_equal(sv_id, np.array([23]))
+
+    with pytest.raises(KeyError):
+        split_gnss_sv_ids(np.array(['X01']))
@@ -111,6 +111,29 @@ def test_posvel_extract(dummy_pos_vel, scaling_value):
     assert np.shape(out_vel)[0]==3, "sv_vel: Incorrect shape Expected 3xN"
 
 
+def test_pos_extract(dummy_pos_vel, scaling_value):
+    """Test extraction of positions straight from the NavData array.
+
+    Parameters
+    ----------
+    dummy_pos_vel : gnss_lib_py.navdata.navdata.NavData
+        NavData example containing position and velocity.
+    scaling_value : np.ndarray
+        Linear range for 6 instances of positions and velocities.
+
+    """
+    exp_pos = np.vstack((scaling_value, 10*scaling_value, 100*scaling_value))
+    out_pos = sv_models._extract_pos_arr(dummy_pos_vel)
+    np.testing.assert_array_equal(out_pos, exp_pos)
+    assert np.shares_memory(out_pos, dummy_pos_vel.array)
+
+    # rows which are not stored next to each other are still extracted
+    shuffled = dummy_pos_vel.copy(rows=['z_sv_m', 'vx_sv_mps',
+                                        'x_sv_m', 'y_sv_m'])
+    np.testing.assert_array_equal(sv_models._extract_pos_arr(shuffled),
+                                  exp_pos)
+
+
 def test_del_xyz_range(dummy_pos_vel, scaling_value):
     """Test calculation of position difference and range calculations.
 
@@ -169,6 +192,70 @@ def test_sv_state_model(gps_measurement_frames, android_gt):
         np.testing.assert_almost_equal(and_sv_posvel[['b_sv_m']], est_sv_posvel['b_sv_m'], decimal=1)
 
 
+def test_sv_states_batch(all_gps_ephem, start_time):
+    """Test that batched SV states match states computed per time.
+
+    Parameters
+    ----------
+    all_gps_ephem : gnss_lib_py.navdata.navdata.NavData
+        Ephemeris parameters for all satellites at the time when measurements
+        were received.
+    start_time : float
+        Time at which measurements were first received in this trace
+        [gps_millis].
+
+    """
+    start_millis = start_time
+    gps_millis = start_millis + np.array([0., 1500., 60000.])
+    batch_posvel = sv_models.find_sv_states_batch(gps_millis, all_gps_ephem)
+    num_svs = len(all_gps_ephem)
+    assert len(batch_posvel) == len(gps_millis)*num_svs
+    for idx, milli in enumerate(gps_millis):
+        sv_posvel = sv_models.find_sv_states(milli, all_gps_ephem)
+        batch_slice = batch_posvel.copy(cols=list(range(idx*num_svs,
+                                                        (idx+1)*num_svs)))
+        np.testing.assert_array_equal(batch_slice['sv_id'],
+                                      sv_posvel['sv_id'])
+        np.testing.assert_array_equal(batch_slice['gps_millis'], milli)
+        for row in SV_KEYS[:-1]:
+            np.testing.assert_allclose(batch_slice[row], sv_posvel[row],
+                                       rtol=1e-12, atol=1e-6)
+
+    # a single time gives the same result as find_sv_states
+    single_posvel = sv_models.find_sv_states_batch(start_millis,
+                                                   all_gps_ephem)
+    np.testing.assert_allclose(single_posvel['x_sv_m'],
+                    sv_models.find_sv_states(start_millis,
+                                             all_gps_ephem)['x_sv_m'])
+
+
+def test_extrapolate_sv_states(all_gps_ephem, start_time):
+    """Test that short extrapolation matches propagating the orbits.
+
+    Parameters
+    ----------
+    all_gps_ephem : gnss_lib_py.navdata.navdata.NavData
+        Ephemeris parameters for all satellites at the time when measurements
+        were received.
+    start_time : float
+        Time at which measurements were first received in this trace
+        [gps_millis].
+
+    """
+    delta_t = 0.03
+    sv_posvel = sv_models.find_sv_states(start_time, all_gps_ephem)
+    exp_posvel = sv_models.find_sv_states(start_time + 1000.*delta_t,
+                                          all_gps_ephem)
+    sv_models._extrapolate_sv_states(sv_posvel, delta_t,
+                                     all_gps_ephem['SVclockDrift'])
+    for row in ['x_sv_m', 'y_sv_m', 'z_sv_m', 'b_sv_m']:
+        np.testing.assert_allclose(sv_posvel[row], exp_posvel[row],
+                                   rtol=0, atol=1e-3)
+    for row in ['vx_sv_mps', 'vy_sv_mps', 'vz_sv_mps']:
+        np.testing.assert_allclose(sv_posvel[row], exp_posvel[row],
+                                   rtol=0, atol=1e-4)
+
+
 def test_visible_ephem(all_gps_ephem, gps_measurement_frames, android_gt):
     """Verify process for finding visible satellites.
 
@@ -396,6 +396,46 @@ def test_array_conversions():
     unix_millis_back = tc.tow_to_unix_millis(gps_week, tow)
     np.testing.assert_array_equal(unix_millis_back, unix_millis)
 
+def test_datetime64_to_gps_millis():
+    """Test vectorized np.datetime64 to GPS millis conversion.
+
+    Checks that the vectorized conversion matches the conversion done
+    one datetime.datetime at a time, including across leap seconds.
+
+    """
+    datetimes_list = [datetime(1981, 6, 30, 23, 59, 59, tzinfo=timezone.utc),
+                      datetime(1981, 7, 1, 0, 0, 0, tzinfo=timezone.utc),
+                      datetime(2016, 12, 31, 23, 59, 59, 500000,
+                               tzinfo=timezone.utc),
+                      datetime(2017, 1, 1, 0, 0, 0, tzinfo=timezone.utc),
+                      datetime(2022, 8, 10, 19, 51, 9, 123456,
+                               tzinfo=timezone.utc)]
+    datetimes_64 = np.array([np.datetime64(t.replace(tzinfo=None), 'ns')
+                             for t in datetimes_list])
+
+    exp_gps_millis = tc.datetime_to_gps_millis(datetimes_list)
+    out_gps_millis = tc.datetime_to_gps_millis(datetimes_64)
+    assert isinstance(out_gps_millis, np.ndarray)
+    assert out_gps_millis.dtype is np.dtype(np.float64)
+    np.testing.assert_array_equal(out_gps_millis, exp_gps_millis)
+
+    # single time returns scalar equivalent
+    out_gps_millis = tc.datetime_to_gps_millis(datetimes_64[-1:])
+    assert out_gps_millis.shape == ()
+    assert out_gps_millis == exp_gps_millis[-1]
+
+    # missing times are converted to NaN
+    datetimes_nat = datetimes_64.copy()
+    datetimes_nat[1] = np.datetime64('NaT')
+    out_gps_millis = tc.datetime_to_gps_millis(datetimes_nat)
+    assert np.isnan(out_gps_millis[1])
+    np.testing.assert_array_equal(np.delete(out_gps_millis, 1),
+                                  np.delete(exp_gps_millis, 1))
+    assert np.isnan(tc.datetime_to_gps_millis(datetimes_nat[1:2]))
+
+    with pytest.raises(RuntimeError):
+        tc.datetime_to_gps_millis(np.array([np.datetime64('1979-01-01')]))
+
 def test_zero_arrays():
     """Test zero array conversions between time types.
 